@@ -0,0 +1,264 @@
+// Headless benchmark: drives the built widget against the mock API serving synthetic histories
+// and records render time, memory and scroll frame rate. Compare against a baseline to catch regressions.
+//
+//   npm run build && npm run bench -- [--sizes=1000,10000] [--runs=3] [--streaming]
+//                                      [--baseline=bench/baseline.json] [--tolerance=0.2] [--save-baseline]
+import { spawn } from 'child_process';
+import { createServer } from 'http';
+import { readFile, writeFile, mkdir } from 'fs/promises';
+import { existsSync } from 'fs';
+import { dirname, extname, join, resolve, sep } from 'path';
+import { fileURLToPath } from 'url';
+
+const root = resolve(dirname(fileURLToPath(import.meta.url)), '..');
+const API_PORT = 3101;
+const PAGE_PORT = 4174;
+const SCROLL_FRAMES = 300;
+const SCROLL_STEP = 60;  // px per frame
+
+const args = Object.fromEntries(process.argv.slice(2).map(arg => {
+  const [key, value] = arg.replace(/^--/, '').split('=');
+  return [key, value ?? true];
+}));
+const sizes = String(args.sizes || '1000,10000').split(',').map(Number);
+const runs = Number(args.runs || 3);
+const tolerance = Number(args.tolerance || 0.2);
+const baselinePath = resolve(root, args.baseline || 'bench/baseline.json');
+
+// How each result compares between runs; fps is the only one where higher is better
+const RESULTS = {
+  tti: 'lower',
+  firstRender: 'lower',
+  historyLoad: 'lower',
+  heapMB: 'lower',
+  domNodes: 'lower',
+  scrollFps: 'higher',
+  scrollP95FrameMs: 'lower',
+  sendFirstByte: 'lower',
+  sendRender: 'lower',
+  markdownP95: 'lower',
+  highlightP95: 'lower',
+  longTaskTotal: 'lower'
+};
+
+const MIME_TYPES = {
+  '.html': 'text/html', '.js': 'text/javascript', '.mjs': 'text/javascript', '.css': 'text/css',
+  '.json': 'application/json', '.map': 'application/json', '.svg': 'image/svg+xml', '.wasm': 'application/wasm'
+};
+
+function serveStatic(port) {
+  const server = createServer(async (req, res) => {
+    const path = resolve(root, '.' + decodeURIComponent(new URL(req.url, 'http://localhost').pathname));
+    if (!path.startsWith(root + sep)) {
+      res.writeHead(403).end();
+      return;
+    }
+    try {
+      const body = await readFile(path);
+      res.writeHead(200, { 'Content-Type': MIME_TYPES[extname(path)] || 'application/octet-stream' }).end(body);
+    } catch (e) {
+      res.writeHead(404).end();
+    }
+  });
+  return new Promise(ready => server.listen(port, () => ready(server)));
+}
+
+function startMockApi(historySize) {
+  const child = spawn(process.execPath, ['mock-api/server.js'], {
+    cwd: root,
+    env: { ...process.env, PORT: String(API_PORT), HISTORY_SIZE: String(historySize), PAGE_SIZE: '100', BOT_DELAY: '50' },
+    stdio: ['ignore', 'pipe', 'inherit']
+  });
+  return new Promise((ready, fail) => {
+    child.once('exit', code => fail(new Error(`Mock API exited with code ${code}`)));
+    child.stdout.on('data', chunk => {
+      if (String(chunk).includes('Mock API:')) ready(child);
+    });
+  });
+}
+
+function percentile(values, p) {
+  if (values.length === 0) return null;
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+}
+
+function median(values) {
+  const present = values.filter(value => value !== null);
+  return present.length ? percentile(present, 0.5) : null;
+}
+
+async function measure(browser) {
+  const page = await browser.newPage({ viewport: { width: 1280, height: 900 } });
+  const cdp = await page.context().newCDPSession(page);
+  await cdp.send('Performance.enable');
+
+  const url = `http://localhost:${PAGE_PORT}/bench/index.html?api=${encodeURIComponent(`http://localhost:${API_PORT}`)}` +
+    (args.streaming ? '&streaming=1' : '');
+  await page.goto(url);
+
+  // Time from init() until the first message is on screen
+  const firstRender = await (await page.waitForFunction(() => {
+    const init = performance.getEntriesByName('chat-widget:init')[0];
+    return init && document.querySelector('.chat-message') ? performance.now() - init.startTime : null;
+  }, null, { polling: 'raf', timeout: 30000 })).jsonValue();
+
+  // Page through the whole history by scrolling to the top until the server has nothing older
+  const historyStart = Date.now();
+  let pages = 1;
+  for (;;) {
+    await page.waitForSelector('.chat-messages-loading', { state: 'detached' });
+    const response = page.waitForResponse(r => r.url().includes('/messages?') && r.url().includes('cursor='), { timeout: 5000 })
+      .catch(() => null);
+    await page.evaluate(() => {
+      const list = document.querySelector('.chat-messages');
+      list.scrollTop = 0;
+      list.dispatchEvent(new Event('scroll'));
+    });
+    const result = await response;
+    if (!result) break;
+    pages++;
+    if (!(await result.json()).hasMore) break;
+  }
+  await page.waitForSelector('.chat-messages-loading', { state: 'detached' });
+  await page.evaluate(() => new Promise(done => requestAnimationFrame(() => setTimeout(done, 0))));
+  const historyLoad = Date.now() - historyStart;
+
+  await cdp.send('HeapProfiler.collectGarbage');
+  const { metrics } = await cdp.send('Performance.getMetrics');
+  const metric = name => metrics.find(m => m.name === name)?.value ?? null;
+
+  // Scroll down through the loaded history one step per frame and record frame times
+  const scroll = await page.evaluate(({ frames, step }) => new Promise(done => {
+    const list = document.querySelector('.chat-messages');
+    const times = [];
+    let last = performance.now();
+    const tick = now => {
+      times.push(now - last);
+      last = now;
+      list.scrollTop += step;
+      if (times.length < frames && list.scrollTop + list.clientHeight < list.scrollHeight) {
+        requestAnimationFrame(tick);
+      } else {
+        done(times.slice(1));
+      }
+    };
+    requestAnimationFrame(tick);
+  }), { frames: SCROLL_FRAMES, step: SCROLL_STEP });
+  const scrollMs = scroll.reduce((sum, t) => sum + t, 0);
+
+  // One round trip through the input, as a user would send it
+  await page.fill('.chat-input-textarea', 'Benchmark message with `code`');
+  await page.press('.chat-input-textarea', 'Enter');
+  await page.waitForFunction(() => window.__benchMetrics.some(m => m.name === 'send-render'), null, { timeout: 30000 });
+
+  const reported = await page.evaluate(() => window.__benchMetrics);
+  const values = name => reported.filter(m => m.name === name).map(m => m.value);
+  await page.close();
+
+  return {
+    tti: values('tti')[0] ?? null,
+    firstRender,
+    historyLoad,
+    pages,
+    heapMB: metric('JSHeapUsedSize') === null ? null : metric('JSHeapUsedSize') / 1024 / 1024,
+    domNodes: metric('Nodes'),
+    scrollFps: scroll.length ? scroll.length * 1000 / scrollMs : null,
+    scrollP95FrameMs: percentile(scroll, 0.95),
+    sendFirstByte: values('send-first-byte')[0] ?? null,
+    sendRender: values('send-render')[0] ?? null,
+    markdownCount: values('markdown').length,
+    markdownP95: percentile(values('markdown'), 0.95),
+    highlightCount: values('highlight').length,
+    highlightP95: percentile(values('highlight'), 0.95),
+    longTaskCount: values('long-task').length,
+    longTaskTotal: values('long-task').reduce((sum, v) => sum + v, 0)
+  };
+}
+
+function compare(results, baseline) {
+  const regressions = [];
+  for (const [size, result] of Object.entries(results)) {
+    const previous = baseline.results?.[size];
+    if (!previous) continue;
+    for (const [key, direction] of Object.entries(RESULTS)) {
+      const before = previous[key];
+      const after = result[key];
+      if (before == null || after == null || before === 0) continue;
+      const change = (after - before) / before;
+      if (direction === 'lower' ? change > tolerance : change < -tolerance) {
+        regressions.push(`${size} messages: ${key} ${before.toFixed(1)} -> ${after.toFixed(1)} (${(change * 100).toFixed(0)}%)`);
+      }
+    }
+  }
+  return regressions;
+}
+
+async function main() {
+  if (!existsSync(join(root, 'dist/chat-widget.es.js'))) {
+    console.error('dist/chat-widget.es.js not found, run `npm run build` first');
+    process.exit(1);
+  }
+
+  let chromium;
+  try {
+    ({ chromium } = await import('playwright'));
+  } catch (e) {
+    console.error('Playwright is required: npm install && npx playwright install chromium');
+    process.exit(1);
+  }
+
+  const pageServer = await serveStatic(PAGE_PORT);
+  const browser = await chromium.launch({ headless: !args.headed });
+  const results = {};
+
+  try {
+    for (const size of sizes) {
+      const api = await startMockApi(size);
+      try {
+        const samples = [];
+        for (let run = 0; run < runs; run++) {
+          samples.push(await measure(browser));
+          console.log(`  ${size} messages, run ${run + 1}/${runs} done`);
+        }
+        // Median per field, so a single noisy run does not decide the outcome
+        results[size] = Object.fromEntries(Object.keys(samples[0]).map(key => [key, median(samples.map(s => s[key]))]));
+      } finally {
+        api.kill();
+      }
+    }
+  } finally {
+    await browser.close();
+    pageServer.close();
+  }
+
+  console.log();
+  console.table(Object.fromEntries(Object.entries(results).map(([size, result]) => [
+    `${size} msgs`,
+    Object.fromEntries(Object.entries(result).map(([key, value]) => [key, value === null ? '-' : Math.round(value * 10) / 10]))
+  ])));
+
+  const report = { date: new Date().toISOString(), runs, streaming: Boolean(args.streaming), results };
+  await mkdir(join(root, 'bench/results'), { recursive: true });
+  await writeFile(join(root, 'bench/results/latest.json'), JSON.stringify(report, null, 2) + '\n');
+
+  if (args['save-baseline']) {
+    await writeFile(baselinePath, JSON.stringify(report, null, 2) + '\n');
+    console.log(`Baseline saved to ${baselinePath}`);
+    return;
+  }
+
+  if (existsSync(baselinePath)) {
+    const regressions = compare(results, JSON.parse(await readFile(baselinePath, 'utf8')));
+    if (regressions.length > 0) {
+      console.error(`\nRegressions beyond ${tolerance * 100}% of the baseline:\n  ${regressions.join('\n  ')}`);
+      process.exit(1);
+    }
+    console.log(`No regressions beyond ${tolerance * 100}% of the baseline`);
+  }
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exit(1);
+});
@@ -2,20 +2,31 @@ import express from 'express';
 import cors from 'cors';
 import multer from 'multer';
 import { v4 as uuid } from 'uuid';
+import fs from 'fs';
+import path from 'path';
+import { generateHistory, syntheticImage } from './synthetic.js';
 
 const app = express();
-const PORT = 3001;
+const PORT = Number(process.env.PORT || 3001);
+const UPLOAD_DIR = './mock-api/uploads/';
+// Fraction of chunk requests to drop, to exercise client retries/resume (e.g. CHUNK_FAIL_RATE=0.2)
+const CHUNK_FAIL_RATE = Number(process.env.CHUNK_FAIL_RATE || 0);
+// Load testing: serve a synthetic history of HISTORY_SIZE messages (code, tables, images),
+// with PAGE_SIZE messages per page and BOT_DELAY ms before POST /messages answers
+const HISTORY_SIZE = Number(process.env.HISTORY_SIZE || 0);
+const PAGE_SIZE = Number(process.env.PAGE_SIZE || 20);
+const BOT_DELAY = Number(process.env.BOT_DELAY ?? 1000);
 
 app.use(cors());
 app.use(express.json());
 
 const storage = multer.diskStorage({
-  destination: './mock-api/uploads/',
+  destination: UPLOAD_DIR,
   filename: (req, file, cb) => cb(null, `${uuid()}-${file.originalname}`)
 });
 const upload = multer({ storage });
 
-let messages = [
+let messages = HISTORY_SIZE > 0 ? generateHistory(HISTORY_SIZE, { baseUrl: `http://localhost:${PORT}` }) : [
   {
     id: '1',
     role: 'assistant',
@@ -26,14 +37,54 @@ let messages = [
 
 const mockAttachments = {};
 
-// GET /messages
+// GET /messages - newest first, paginated by message id
+//   ?cursor=<id>  only messages older than <id>
+//   ?since=<id>   only messages newer than <id> (delta sync)
+//   ?limit=<n>    page size (default PAGE_SIZE, max 100 or PAGE_SIZE)
 app.get('/messages', (req, res) => {
-  res.json({ messages, hasMore: false, nextCursor: null });
+  const limit = Math.min(Number(req.query.limit) || PAGE_SIZE, Math.max(PAGE_SIZE, 100));
+  let start = 0;
+  let end = messages.length;
+
+  if (req.query.cursor) {
+    const index = messages.findIndex(m => m.id === req.query.cursor);
+    end = index === -1 ? 0 : index;
+  }
+  let reset = false;
+  if (req.query.since) {
+    // Unknown ids (e.g. after a server restart) get the newest page and a reset flag, not the full history
+    const index = messages.findIndex(m => m.id === req.query.since);
+    reset = index === -1;
+    start = reset ? 0 : index + 1;
+  }
+
+  const from = Math.max(start, end - limit);
+  const page = messages.slice(from, Math.max(from, end)).reverse();
+  const hasMore = from > start;
+  res.json({ messages: page, hasMore, nextCursor: hasMore ? messages[from].id : null, ...(reset && { reset }) });
 });
 
+// Replies by clientId, so a retried send is answered without duplicating the message
+const sentByClientId = {};
+
+// Simulated rate limit for POST /messages (e.g. RATE_LIMIT=5 allows 5 sends per 10s)
+const RATE_LIMIT = Number(process.env.RATE_LIMIT || 0);
+let sendWindow = { start: Date.now(), count: 0 };
+
+function rateLimited(res) {
+  if (!RATE_LIMIT) return false;
+  if (Date.now() - sendWindow.start > 10000) sendWindow = { start: Date.now(), count: 0 };
+  if (++sendWindow.count <= RATE_LIMIT) return false;
+  const retryAfter = Math.ceil((sendWindow.start + 10000 - Date.now()) / 1000);
+  res.set('Retry-After', String(retryAfter)).status(429).json({ error: 'Too many requests' });
+  return true;
+}
+
 // POST /messages
 app.post('/messages', (req, res) => {
-  const { content, attachments } = req.body;
+  const { content, attachments, clientId } = req.body;
+  if (clientId && sentByClientId[clientId]) return res.json(sentByClientId[clientId]);
+  if (rateLimited(res)) return;
 
   const userMessage = {
     id: uuid(),
@@ -50,11 +101,73 @@ app.post('/messages', (req, res) => {
     messages.push(botMessage);
 
     // Return both messages
-    res.json({
-      message: userMessage,
-      response: botMessage
+    const result = { message: userMessage, response: botMessage };
+    if (clientId) sentByClientId[clientId] = result;
+    res.json(result);
+  }, BOT_DELAY);
+});
+
+// POST /messages/stream - Server-Sent Events variant of POST /messages
+// Emits `user` (persisted user message), `delta` (response chunks) and `done` (final bot message)
+app.post('/messages/stream', (req, res) => {
+  const { content, attachments, clientId } = req.body;
+  const startedAt = Date.now();
+  const send = (event, data) => res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+  const startEvents = () => {
+    res.writeHead(200, {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache',
+      'Connection': 'keep-alive'
     });
-  }, 1000);
+    res.flushHeaders();
+  };
+
+  // Resent after a dropped connection: replay the stored result instead of posting twice
+  const sent = clientId && sentByClientId[clientId];
+  if (sent) {
+    startEvents();
+    send('user', { message: sent.message });
+    send('done', sent.response ? { response: sent.response } : {});
+    return res.end();
+  }
+
+  const userMessage = {
+    id: uuid(),
+    role: 'user',
+    content,
+    attachments: attachments?.map(id => mockAttachments[id]).filter(Boolean),
+    createdAt: new Date().toISOString()
+  };
+  messages.push(userMessage);
+  if (clientId) sentByClientId[clientId] = { message: userMessage };
+
+  startEvents();
+  send('user', { message: userMessage });
+
+  const botMessage = generateResponse(content);
+  // Split on word boundaries, keeping whitespace so the chunks re-join losslessly
+  const chunks = botMessage.content.match(/\S+\s*|\s+/g) || [];
+  const firstTokenDelay = Number(req.query.ttft ?? 300);
+  const tokenDelay = Number(req.query.delay ?? 30);
+  let index = 0;
+  let timer;
+
+  const next = () => {
+    if (index === 0) console.log(`[stream] time-to-first-token: ${Date.now() - startedAt}ms`);
+    if (index < chunks.length) {
+      send('delta', { delta: chunks[index++] });
+      timer = setTimeout(next, tokenDelay);
+      return;
+    }
+    messages.push(botMessage);
+    if (clientId) sentByClientId[clientId].response = botMessage;
+    send('done', { response: botMessage });
+    console.log(`[stream] completed ${chunks.length} chunks in ${Date.now() - startedAt}ms`);
+    res.end();
+  };
+
+  timer = setTimeout(next, firstTokenDelay);
+  res.on('close', () => clearTimeout(timer));
 });
 
 // POST /upload
@@ -73,6 +186,114 @@ app.post('/upload', upload.single('file'), (req, res) => {
   res.json(response);
 });
 
+// === Chunked, resumable uploads ===
+const chunkedUploads = {};        // uploadId -> session
+const uploadsByFingerprint = {};  // fingerprint:chunkSize -> uploadId
+
+function registerUpload({ filename, mimeType, size, storedName, thumbnailName }) {
+  const id = uuid();
+  const url = `http://localhost:${PORT}/uploads/${storedName}`;
+  const isImage = mimeType.startsWith('image/');
+  const response = {
+    id,
+    url,
+    filename,
+    mimeType,
+    size,
+    thumbnailUrl: thumbnailName ? `http://localhost:${PORT}/uploads/${thumbnailName}` : (isImage ? url : null)
+  };
+  mockAttachments[id] = { id, type: isImage ? 'image' : 'file', ...response };
+  return response;
+}
+
+// POST /upload/chunked - start (or resume) an upload session
+app.post('/upload/chunked', (req, res) => {
+  const { filename, mimeType, size, chunkSize, fingerprint } = req.body;
+  const key = `${fingerprint}:${chunkSize}`;
+  const existing = chunkedUploads[uploadsByFingerprint[key]];
+
+  if (existing && !existing.result) {
+    return res.json({ uploadId: existing.id, received: Object.keys(existing.chunks).map(Number) });
+  }
+
+  const id = uuid();
+  chunkedUploads[id] = {
+    id,
+    filename,
+    mimeType,
+    size,
+    chunkSize,
+    chunkCount: Math.max(1, Math.ceil(size / chunkSize)),
+    chunks: {},
+    thumbnail: null,
+    result: null
+  };
+  uploadsByFingerprint[key] = id;
+  res.json({ uploadId: id, received: [] });
+});
+
+const rawBody = express.raw({ type: () => true, limit: '50mb' });
+
+// PUT /upload/chunked/:uploadId/thumbnail - optional client-generated thumbnail
+app.put('/upload/chunked/:uploadId/thumbnail', rawBody, (req, res) => {
+  const session = chunkedUploads[req.params.uploadId];
+  if (!session) return res.status(404).json({ error: 'Unknown upload' });
+  session.thumbnail = { data: req.body, mimeType: req.headers['content-type'] || 'image/webp' };
+  res.json({ ok: true });
+});
+
+// PUT /upload/chunked/:uploadId/:index - one chunk, idempotent
+app.put('/upload/chunked/:uploadId/:index', rawBody, (req, res) => {
+  const session = chunkedUploads[req.params.uploadId];
+  if (!session) return res.status(404).json({ error: 'Unknown upload' });
+
+  const index = Number(req.params.index);
+  if (!Number.isInteger(index) || index < 0 || index >= session.chunkCount) {
+    return res.status(400).json({ error: 'Invalid chunk index' });
+  }
+  if (Math.random() < CHUNK_FAIL_RATE) {
+    return req.socket.destroy();
+  }
+
+  session.chunks[index] = req.body;
+  res.json({ received: index });
+});
+
+// POST /upload/chunked/:uploadId/complete - assemble chunks into the final file
+app.post('/upload/chunked/:uploadId/complete', (req, res) => {
+  const session = chunkedUploads[req.params.uploadId];
+  if (!session) return res.status(404).json({ error: 'Unknown upload' });
+  if (session.result) return res.json(session.result);
+
+  const missing = [];
+  for (let i = 0; i < session.chunkCount; i++) {
+    if (!session.chunks[i]) missing.push(i);
+  }
+  if (missing.length > 0) {
+    return res.status(409).json({ error: 'Missing chunks', missing });
+  }
+
+  const storedName = `${uuid()}-${path.basename(session.filename)}`;
+  const data = Buffer.concat(Array.from({ length: session.chunkCount }, (_, i) => session.chunks[i]));
+  fs.writeFileSync(path.join(UPLOAD_DIR, storedName), data);
+
+  let thumbnailName = null;
+  if (session.thumbnail) {
+    thumbnailName = `${uuid()}-thumb.${session.thumbnail.mimeType.split('/')[1] || 'webp'}`;
+    fs.writeFileSync(path.join(UPLOAD_DIR, thumbnailName), session.thumbnail.data);
+  }
+
+  session.result = registerUpload({
+    filename: session.filename,
+    mimeType: session.mimeType,
+    size: data.length,
+    storedName,
+    thumbnailName
+  });
+  session.chunks = {};
+  res.json(session.result);
+});
+
 // GET /link-preview
 app.get('/link-preview', (req, res) => {
   const url = req.query.url;
@@ -87,6 +308,11 @@ app.get('/link-preview', (req, res) => {
 
 app.use('/uploads', express.static('./mock-api/uploads'));
 
+// GET /synthetic/image/:id.svg - images referenced by the synthetic history
+app.get('/synthetic/image/:id.svg', (req, res) => {
+  res.set('Cache-Control', 'public, max-age=86400').type('image/svg+xml').send(syntheticImage(req.params.id));
+});
+
 function generateResponse(content) {
   const lower = content.toLowerCase();
 
@@ -153,4 +379,4 @@ function generateResponse(content) {
   };
 }
 
-app.listen(PORT, () => console.log(`Mock API: http://localhost:${PORT}`));
+app.listen(PORT, () => console.log(`Mock API: http://localhost:${PORT}${HISTORY_SIZE ? ` (${HISTORY_SIZE} synthetic messages)` : ''}`));
@@ -0,0 +1,92 @@
+// Deterministic synthetic chat history for load testing (HISTORY_SIZE=1000 node mock-api/server.js).
+// Mixes the content the widget is slowest at: prose, code blocks, tables and image galleries.
+
+// Small seeded PRNG so every run serves the same content (timestamps end at server start)
+function mulberry32(seed) {
+  return () => {
+    seed |= 0;
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+const WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore ' +
+  'et dolore magna aliqua widget render message stream cache worker bundle latency scroll frame').split(' ');
+
+const CODE_SAMPLES = [
+  ['typescript', i => `interface Item${i} {\n  id: string;\n  value: number;\n}\n\nexport function sum${i}(items: Item${i}[]): number {\n  return items.reduce((total, item) => total + item.value, 0);\n}`],
+  ['python', i => `def fib_${i}(n):\n    a, b = 0, 1\n    for _ in range(n):\n        a, b = b, a + b\n    return a\n\nprint([fib_${i}(k) for k in range(10)])`],
+  ['json', i => `{\n  "id": ${i},\n  "name": "item-${i}",\n  "tags": ["alpha", "beta"],\n  "nested": { "enabled": true, "ratio": 0.${i % 10} }\n}`],
+  ['bash', i => `#!/usr/bin/env bash\nset -euo pipefail\nfor f in logs/*.log; do\n  grep -c "ERROR ${i}" "$f" || true\ndone`],
+  ['css', i => `.card-${i} {\n  display: grid;\n  grid-template-columns: repeat(3, 1fr);\n  gap: ${i % 24}px;\n}`]
+];
+
+export function generateHistory(count, { baseUrl, seed = 42 } = {}) {
+  const random = mulberry32(seed);
+  const pick = list => list[Math.floor(random() * list.length)];
+  const int = (min, max) => min + Math.floor(random() * (max - min + 1));
+  const sentence = () => {
+    const words = Array.from({ length: int(6, 18) }, () => pick(WORDS));
+    words[0] = words[0][0].toUpperCase() + words[0].slice(1);
+    return `${words.join(' ')}.`;
+  };
+  const paragraph = () => Array.from({ length: int(1, 4) }, sentence).join(' ');
+
+  const code = (i) => {
+    const [lang, sample] = pick(CODE_SAMPLES);
+    const body = Array.from({ length: int(1, 3) }, () => sample(i)).join('\n\n');
+    return '```' + lang + '\n' + body + '\n```';
+  };
+
+  const table = () => {
+    const columns = int(3, 6);
+    const rows = int(3, 12);
+    const header = Array.from({ length: columns }, (_, c) => `Col ${c + 1}`);
+    const lines = [`| ${header.join(' | ')} |`, `| ${header.map(() => '---').join(' | ')} |`];
+    for (let r = 0; r < rows; r++) {
+      lines.push(`| ${header.map(() => pick(WORDS)).join(' | ')} |`);
+    }
+    return lines.join('\n');
+  };
+
+  const images = (i) => Array.from({ length: int(1, 4) }, (_, n) => {
+    const id = `syn-img-${i}-${n}`;
+    const url = `${baseUrl}/synthetic/image/${id}.svg`;
+    return { id, type: 'image', url, thumbnailUrl: url, filename: `${id}.svg`, mimeType: 'image/svg+xml' };
+  });
+
+  const start = Date.now() - count * 30000;
+  return Array.from({ length: count }, (_, i) => {
+    const role = i % 2 === 0 ? 'user' : 'assistant';
+    const message = { id: `syn-${i}`, role, createdAt: new Date(start + i * 30000).toISOString() };
+    const kind = role === 'user' ? (random() < 0.15 ? 'images' : 'text') : pick(['text', 'text', 'code', 'code', 'table', 'images', 'mixed']);
+
+    switch (kind) {
+      case 'code':
+        return { ...message, content: `${sentence()}\n\n${code(i)}` };
+      case 'table':
+        return { ...message, content: `${sentence()}\n\n${table()}` };
+      case 'images':
+        return { ...message, content: sentence(), attachments: images(i) };
+      case 'mixed':
+        return {
+          ...message,
+          content: `## ${sentence()}\n\n${paragraph()}\n\n- **${pick(WORDS)}** ${sentence()}\n- ${sentence()}\n\n${code(i)}\n\n${table()}`
+        };
+      default:
+        return { ...message, content: random() < 0.5 ? sentence() : `${paragraph()}\n\n${paragraph()}` };
+    }
+  });
+}
+
+// Placeholder image with a stable color per id
+export function syntheticImage(id) {
+  let hash = 0;
+  for (const char of id) hash = (hash * 31 + char.charCodeAt(0)) | 0;
+  const hue = Math.abs(hash) % 360;
+  return `<svg xmlns="http://www.w3.org/2000/svg" width="640" height="400" viewBox="0 0 640 400">` +
+    `<rect width="640" height="400" fill="hsl(${hue},60%,70%)"/>` +
+    `<text x="320" y="210" font-family="sans-serif" font-size="32" text-anchor="middle" fill="#333">${id}</text></svg>`;
+}
@@ -0,0 +1,86 @@
+// Bundle size report: raw and gzip size of every emitted script, plus the initial
+// download of each entry (the entry and its static imports) checked against size-budget.json.
+// Writes dist/size-report.json and exits non-zero when a budget is exceeded.
+import { readFileSync, writeFileSync, readdirSync, statSync, existsSync } from 'fs';
+import { dirname, join, relative, resolve } from 'path';
+import { fileURLToPath } from 'url';
+import { gzipSync } from 'zlib';
+
+const root = resolve(dirname(fileURLToPath(import.meta.url)), '..');
+const dist = join(root, 'dist');
+const budgetFile = join(root, 'size-budget.json');
+
+// Static `import ... from "./x.js"` / `import "./x.js"` / `export ... from "./x.js"`; dynamic import() is excluded
+const STATIC_IMPORT = /(?:^|[;\s}])(?:import|export)\s*(?:[^"'();]*?\bfrom\s*)?["'](\.{1,2}\/[^"']+\.js)["']/g;
+
+function listScripts(dir) {
+  return readdirSync(dir).flatMap(name => {
+    const path = join(dir, name);
+    if (statSync(path).isDirectory()) return listScripts(path);
+    return name.endsWith('.js') ? [path] : [];
+  });
+}
+
+function measure(path) {
+  const content = readFileSync(path);
+  return { raw: content.length, gzip: gzipSync(content, { level: 9 }).length };
+}
+
+// The entry plus every chunk it pulls in before running
+function initialFiles(entry) {
+  const seen = new Set();
+  const visit = (path) => {
+    if (seen.has(path) || !existsSync(path)) return;
+    seen.add(path);
+    const source = readFileSync(path, 'utf8');
+    for (const match of source.matchAll(STATIC_IMPORT)) {
+      visit(resolve(dirname(path), match[1]));
+    }
+  };
+  visit(entry);
+  return [...seen];
+}
+
+function formatBytes(bytes) {
+  return bytes < 1024 ? `${bytes} B` : `${(bytes / 1024).toFixed(1)} KB`;
+}
+
+if (!existsSync(dist)) {
+  console.error('dist/ not found, run the build first');
+  process.exit(1);
+}
+
+const sizes = new Map(listScripts(dist).map(path => [path, measure(path)]));
+const { budgets } = JSON.parse(readFileSync(budgetFile, 'utf8'));
+
+const entries = budgets.map(budget => {
+  const entry = join(dist, budget.entry);
+  if (!sizes.has(entry)) return { ...budget, missing: true, ok: false };
+  const files = initialFiles(entry);
+  const raw = files.reduce((sum, file) => sum + (sizes.get(file)?.raw ?? 0), 0);
+  const gzip = files.reduce((sum, file) => sum + (sizes.get(file)?.gzip ?? 0), 0);
+  const ok = budget.maxGzip === undefined || gzip <= budget.maxGzip;
+  return { ...budget, files: files.map(file => relative(dist, file)), raw, gzip, ok };
+});
+
+const report = {
+  entries,
+  files: [...sizes].map(([path, size]) => ({ file: relative(dist, path), ...size })).sort((a, b) => b.gzip - a.gzip)
+};
+writeFileSync(join(dist, 'size-report.json'), JSON.stringify(report, null, 2) + '\n');
+
+console.log('\nBundle size (initial download per entry)\n');
+for (const entry of entries) {
+  if (entry.missing) {
+    console.log(`  ✗ ${entry.name}: ${entry.entry} not found`);
+    continue;
+  }
+  const limit = entry.maxGzip === undefined ? '' : ` / budget ${formatBytes(entry.maxGzip)}`;
+  console.log(`  ${entry.ok ? '✓' : '✗'} ${entry.name}: ${formatBytes(entry.gzip)} gzip (${formatBytes(entry.raw)} raw)${limit}`);
+}
+console.log(`\n  ${report.files.length} scripts, full report in dist/size-report.json\n`);
+
+if (entries.some(entry => !entry.ok)) {
+  console.error('Bundle size check failed');
+  process.exit(1);
+}
@@ -5,13 +5,14 @@ import { mergeConfig } from './config';
 import { useChat } from './hooks/useChat';
 import { useUpload } from './hooks/useUpload';
 import { useTheme } from './hooks/useTheme';
+import { reportInteractive } from './utils/metrics';
 import { ChatToggle } from './components/ChatToggle';
 import { ChatWindow } from './components/ChatWindow';
 import './styles/variables.css';
 import './styles/base.css';
+import './styles/toggle.css';
 import './styles/components.css';
 import './styles/animations.css';
-import 'glightbox/dist/css/glightbox.min.css';
 
 interface ChatWidgetProps {
   config: ChatWidgetConfig;
@@ -35,8 +36,11 @@ export function ChatWidget({ config: userConfig }: ChatWidgetProps) {
 
   useTheme(config.theme, 'chat-widget-root');
 
+  useEffect(() => reportInteractive('widget'), []);
+
+  // Not gated on messages.length: restored outbox entries are in state before any history is loaded
   useEffect(() => {
-    if (state.isOpen && state.messages.length === 0 && !state.isLoading) {
+    if (state.isOpen && !state.initialLoaded && !state.isLoading) {
       actions.loadMessages();
     }
   }, [state.isOpen]);
@@ -68,6 +72,8 @@ export function ChatWidget({ config: userConfig }: ChatWidgetProps) {
         onClose={actions.close}
         onSend={handleSend}
         onLoadMore={actions.loadMessages}
+        onRetry={actions.retry}
+        onStop={actions.stop}
         onFilesSelected={handleFilesSelected}
         onRemoveFile={upload.actions.removeFile}
       />
@@ -1,6 +1,6 @@
 import { h } from 'preact';
 import { useState, useRef } from 'preact/hooks';
-import { Send, Paperclip } from 'lucide-preact';
+import { Send, Square, Paperclip } from 'lucide-preact';
 import type { LabelsConfig, UploadResponse } from '../types';
 import { FileUpload } from './FileUpload';
 
@@ -12,9 +12,12 @@ interface ChatInputProps {
     files: File[];
     isUploading: boolean;
     progress: number;
+    fileProgress?: number[];
   };
   onRemoveFile?: (index: number) => void;
   fileUploadEnabled: boolean;
+  isStreaming?: boolean;
+  onStop?: () => void;
 }
 
 export function ChatInput({
@@ -23,7 +26,9 @@ export function ChatInput({
   onFilesSelected,
   uploadState,
   onRemoveFile,
-  fileUploadEnabled
+  fileUploadEnabled,
+  isStreaming,
+  onStop
 }: ChatInputProps) {
   const [message, setMessage] = useState('');
   const textareaRef = useRef<HTMLTextAreaElement>(null);
@@ -74,6 +79,7 @@ export function ChatInput({
           files={uploadState.files}
           isUploading={uploadState.isUploading}
           progress={uploadState.progress}
+          fileProgress={uploadState.fileProgress}
           onRemove={onRemoveFile!}
         />
       )}
@@ -108,14 +114,25 @@ export function ChatInput({
           rows={1}
           disabled={uploadState?.isUploading}
         />
-        <button
-          type="submit"
-          class="chat-input-send"
-          disabled={(!message.trim() && !uploadState?.files.length) || uploadState?.isUploading}
-          aria-label={labels.sendButton}
-        >
-          <Send size={20} />
-        </button>
+        {isStreaming && onStop ? (
+          <button
+            type="button"
+            class="chat-input-send chat-input-stop"
+            onClick={onStop}
+            aria-label={labels.stopButton}
+          >
+            <Square size={18} />
+          </button>
+        ) : (
+          <button
+            type="submit"
+            class="chat-input-send"
+            disabled={(!message.trim() && !uploadState?.files.length) || uploadState?.isUploading}
+            aria-label={labels.sendButton}
+          >
+            <Send size={20} />
+          </button>
+        )}
       </form>
     </div>
   );
@@ -0,0 +1,89 @@
+import { h } from 'preact';
+import { useEffect, useState } from 'preact/hooks';
+import type { ChatWidgetConfig } from '../types';
+import { mergeConfig } from '../config';
+import { useTheme } from '../hooks/useTheme';
+import { reportInteractive } from '../utils/metrics';
+import { ChatToggle } from './ChatToggle';
+
+type ChatWidgetModule = typeof import('../ChatWidget');
+
+let widgetModule: Promise<ChatWidgetModule> | null = null;
+
+// Fetches the full widget (window, markdown, upload) once; a failed fetch can be retried
+export function loadChatWidget(): Promise<ChatWidgetModule> {
+  if (!widgetModule) {
+    widgetModule = import('../ChatWidget');
+    widgetModule.catch(() => { widgetModule = null; });
+  }
+  return widgetModule;
+}
+
+function whenIdle(callback: () => void): () => void {
+  if (typeof requestIdleCallback === 'function') {
+    const handle = requestIdleCallback(callback, { timeout: 5000 });
+    return () => cancelIdleCallback(handle);
+  }
+  const handle = setTimeout(callback, 2000);
+  return () => clearTimeout(handle);
+}
+
+interface ChatLauncherProps {
+  config: ChatWidgetConfig;
+}
+
+// Renders only the toggle button until the chat is first opened, then swaps in the full widget
+export function ChatLauncher({ config: userConfig }: ChatLauncherProps) {
+  const config = mergeConfig(userConfig);
+  const [Widget, setWidget] = useState<ChatWidgetModule['ChatWidget'] | null>(null);
+  const [isOpening, setIsOpening] = useState(false);
+
+  useTheme(config.theme, 'chat-widget-root');
+
+  const open = () => {
+    if (isOpening) return;
+    setIsOpening(true);
+    loadChatWidget()
+      .then(module => setWidget(() => module.ChatWidget))
+      .catch(error => {
+        setIsOpening(false);
+        config.onError(error as Error);
+      });
+  };
+
+  useEffect(() => {
+    config.onReady();
+    reportInteractive('loader');
+    if (config.startOpen) {
+      open();
+      return;
+    }
+    return whenIdle(() => { loadChatWidget().catch(() => {}); });
+  }, []);
+
+  const handleClick = () => {
+    open();
+    config.onOpen();
+  };
+
+  if (Widget) {
+    // onReady already fired for the launcher
+    return <Widget config={{ ...userConfig, startOpen: true, onReady: undefined }} />;
+  }
+
+  return (
+    <div
+      class={`chat-widget chat-widget-${config.position}`}
+      style={{
+        [config.position === 'right' ? 'right' : 'left']: `${config.offsetX}px`,
+        bottom: `${config.offsetY}px`
+      }}
+    >
+      <ChatToggle
+        isOpen={isOpening}
+        onClick={handleClick}
+        onIntent={() => { loadChatWidget().catch(() => {}); }}
+      />
+    </div>
+  );
+}
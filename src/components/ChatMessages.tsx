@@ -1,8 +1,15 @@
 import { h } from 'preact';
-import { useEffect, useRef } from 'preact/hooks';
+import { useCallback, useEffect, useRef } from 'preact/hooks';
 import type { Message as MessageType, FeaturesConfig, LabelsConfig } from '../types';
+import type { CodeTheme } from '../utils/highlighter';
 import { Message } from './Message';
 import { TypingIndicator } from './TypingIndicator';
+import { useVirtualList } from '../hooks/useVirtualList';
+
+// Below this many messages the full list is rendered
+const VIRTUALIZE_THRESHOLD = 100;
+// Distance from the bottom (px) within which a streaming response is followed
+const FOLLOW_THRESHOLD = 80;
 
 interface ChatMessagesProps {
   messages: MessageType[];
@@ -11,7 +18,9 @@ interface ChatMessagesProps {
   hasMore: boolean;
   features: Required<FeaturesConfig>;
   labels: Required<LabelsConfig>;
+  codeTheme: CodeTheme;
   onLoadMore: () => void;
+  onRetry?: (messageId: string) => void;
 }
 
 export function ChatMessages({
@@ -21,24 +30,66 @@ export function ChatMessages({
   hasMore,
   features,
   labels,
-  onLoadMore
+  codeTheme,
+  onLoadMore,
+  onRetry
 }: ChatMessagesProps) {
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const containerRef = useRef<HTMLDivElement>(null);
   const prevScrollHeight = useRef(0);
+  // Scrolling up to read stops following a streaming response; returning to the bottom resumes it.
+  // Only upward scrolls count, so an in-flight smooth scroll to the end does not stop it.
+  const following = useRef(true);
+  const lastScrollTop = useRef(0);
+
+  // Offscreen rows are unmounted; their HTML stays in the render cache so remounting is cheap
+  const getKey = useCallback((index: number) => messages[index].id, [messages]);
+  const virtual = useVirtualList({
+    containerRef,
+    count: messages.length,
+    getKey,
+    enabled: features.virtualScroll && messages.length > VIRTUALIZE_THRESHOLD
+  });
+  const { range } = virtual;
 
+  // Only new messages at the end scroll to the bottom; an older page prepended at the top
+  // keeps the reader's position (restored by the anchor / scrollHeight logic)
+  const lastId = messages[messages.length - 1]?.id;
+  const prevLastId = useRef<string | undefined>(undefined);  // undefined: scroll to the end on mount
+  const prevTyping = useRef(isTyping);
   useEffect(() => {
-    if (messagesEndRef.current && !isLoading) {
+    const appended = lastId !== prevLastId.current;
+    const typingChanged = isTyping !== prevTyping.current;
+    prevLastId.current = lastId;
+    prevTyping.current = isTyping;
+    if (messagesEndRef.current && !isLoading && (appended || typingChanged)) {
       messagesEndRef.current.scrollIntoView({ behavior: 'smooth' });
     }
   }, [messages.length, isTyping]);
 
+  // Follow a streaming response as it grows
+  const lastMessage = messages[messages.length - 1];
+  useEffect(() => {
+    if (messagesEndRef.current && lastMessage?.status === 'streaming' && following.current) {
+      messagesEndRef.current.scrollIntoView({ block: 'end' });
+    }
+  }, [lastMessage?.content]);
+
   const handleScroll = () => {
-    if (!containerRef.current || isLoading || !hasMore) return;
+    virtual.onScroll();
+    if (!containerRef.current) return;
+    const { scrollTop, scrollHeight, clientHeight } = containerRef.current;
+    if (scrollHeight - scrollTop - clientHeight <= FOLLOW_THRESHOLD) following.current = true;
+    else if (scrollTop < lastScrollTop.current) following.current = false;
+    lastScrollTop.current = scrollTop;
+    if (isLoading || !hasMore) return;
 
-    const { scrollTop } = containerRef.current;
     if (scrollTop === 0) {
-      prevScrollHeight.current = containerRef.current.scrollHeight;
+      if (range.enabled) {
+        virtual.captureAnchor();
+      } else {
+        prevScrollHeight.current = containerRef.current.scrollHeight;
+      }
       onLoadMore();
     }
   };
@@ -65,9 +116,27 @@ export function ChatMessages({
     <div class="chat-messages" ref={containerRef} onScroll={handleScroll}>
       {isLoading && <div class="chat-messages-loading">Loading...</div>}
 
-      {messages.map((message) => (
-        <Message key={message.id} message={message} features={features} />
-      ))}
+      {range.enabled ? (
+        <div
+          class="chat-messages-virtual"
+          style={{ paddingTop: `${range.paddingTop}px`, paddingBottom: `${range.paddingBottom}px` }}
+        >
+          {messages.slice(range.start, range.end).map((message, i) => (
+            <div
+              key={message.id}
+              class="chat-messages-row"
+              data-virtual-key={message.id}
+              data-virtual-index={range.start + i}
+            >
+              <Message message={message} features={features} codeTheme={codeTheme} retryLabel={labels.retryText} onRetry={onRetry} />
+            </div>
+          ))}
+        </div>
+      ) : (
+        messages.map((message) => (
+          <Message key={message.id} message={message} features={features} codeTheme={codeTheme} retryLabel={labels.retryText} onRetry={onRetry} />
+        ))
+      )}
 
       {isTyping && features.typingIndicator && (
         <div class="chat-message chat-message-assistant">
@@ -4,14 +4,18 @@ import { MessageCircle, X } from 'lucide-preact';
 interface ChatToggleProps {
   isOpen: boolean;
   onClick: () => void;
+  onIntent?: () => void;  // Hover/focus/touch, used to prefetch the chat window
   unreadCount?: number;
 }
 
-export function ChatToggle({ isOpen, onClick, unreadCount }: ChatToggleProps) {
+export function ChatToggle({ isOpen, onClick, onIntent, unreadCount }: ChatToggleProps) {
   return (
     <button
       class="chat-toggle"
       onClick={onClick}
+      onMouseEnter={onIntent}
+      onFocus={onIntent}
+      onTouchStart={onIntent}
       aria-label={isOpen ? 'Close chat' : 'Open chat'}
     >
       {isOpen ? (
@@ -4,6 +4,7 @@ import type { MergedChatWidgetConfig } from '../config';
 import { ChatHeader } from './ChatHeader';
 import { ChatMessages } from './ChatMessages';
 import { ChatInput } from './ChatInput';
+import { resolveColorScheme } from '../hooks/useTheme';
 
 interface ChatWindowProps {
   state: ChatState;
@@ -12,10 +13,13 @@ interface ChatWindowProps {
     files: File[];
     isUploading: boolean;
     progress: number;
+    fileProgress?: number[];
   };
   onClose: () => void;
   onSend: (message: string, attachmentIds?: string[]) => void;
   onLoadMore: () => void;
+  onRetry?: (messageId: string) => void;
+  onStop?: () => void;
   onFilesSelected?: (files: File[]) => void;
   onRemoveFile?: (index: number) => void;
 }
@@ -27,11 +31,15 @@ export function ChatWindow({
   onClose,
   onSend,
   onLoadMore,
+  onRetry,
+  onStop,
   onFilesSelected,
   onRemoveFile
 }: ChatWindowProps) {
   if (!state.isOpen) return null;
 
+  const isStreaming = state.messages[state.messages.length - 1]?.status === 'streaming';
+
   return (
     <div class={`chat-window chat-window-${config.position}`}>
       <ChatHeader labels={config.labels} onClose={onClose} />
@@ -49,7 +57,9 @@ export function ChatWindow({
         hasMore={state.hasMore}
         features={config.features}
         labels={config.labels}
+        codeTheme={resolveColorScheme(config.theme.mode)}
         onLoadMore={onLoadMore}
+        onRetry={onRetry}
       />
 
       <ChatInput
@@ -59,6 +69,8 @@ export function ChatWindow({
         uploadState={uploadState}
         onRemoveFile={onRemoveFile}
         fileUploadEnabled={config.features.fileUpload}
+        isStreaming={isStreaming}
+        onStop={onStop}
       />
     </div>
   );
@@ -6,11 +6,12 @@ interface FileUploadProps {
   files: File[];
   isUploading: boolean;
   progress: number;
+  fileProgress?: number[];
   onRemove: (index: number) => void;
   onDrop?: (files: File[]) => void;
 }
 
-export function FileUpload({ files, isUploading, progress, onRemove, onDrop }: FileUploadProps) {
+export function FileUpload({ files, isUploading, progress, fileProgress, onRemove, onDrop }: FileUploadProps) {
   if (files.length === 0) return null;
 
   return (
@@ -20,6 +21,11 @@ export function FileUpload({ files, isUploading, progress, onRemove, onDrop }: F
           <div class="chat-file-upload-info">
             <div class="chat-file-upload-name">{file.name}</div>
             <div class="chat-file-upload-size">{formatFileSize(file.size)}</div>
+            {isUploading && fileProgress && files.length > 1 && (
+              <div class="chat-file-upload-progress chat-file-upload-progress-file">
+                <div class="chat-file-upload-progress-bar" style={{ width: `${fileProgress[index] ?? 0}%` }} />
+              </div>
+            )}
           </div>
           {!isUploading && (
             <button
@@ -18,7 +18,11 @@ export function MessageImages({ images, enableGallery }: MessageImagesProps) {
 
     let destroyed = false;
 
-    import('glightbox').then(({ default: GLightbox }) => {
+    // The gallery and its styles load with the first message that has images
+    Promise.all([
+      import('glightbox'),
+      import('glightbox/dist/css/glightbox.min.css')
+    ]).then(([{ default: GLightbox }]) => {
       if (destroyed) return;
 
       // Destroy previous instance if exists
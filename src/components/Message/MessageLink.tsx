@@ -1,13 +1,31 @@
 import { h } from 'preact';
+import { useEffect, useState } from 'preact/hooks';
 import { ExternalLink } from 'lucide-preact';
-import type { Attachment } from '../../types';
+import type { Attachment, LinkPreviewResponse } from '../../types';
 import { extractDomain } from '../../utils/formatters';
+import { getLinkPreview } from '../../hooks/useApi';
 
 interface MessageLinkProps {
   link: Attachment;
 }
 
 export function MessageLink({ link }: MessageLinkProps) {
+  const [preview, setPreview] = useState<LinkPreviewResponse | null>(null);
+
+  // Bare links (no title from the server) are filled in from GET /link-preview, cached per URL
+  useEffect(() => {
+    if (link.title) return;
+    let active = true;
+    getLinkPreview(link.url)
+      .then(result => { if (active) setPreview(result); })
+      .catch(() => {});
+    return () => { active = false; };
+  }, [link.url, link.title]);
+
+  const title = link.title || preview?.title;
+  const description = link.description || preview?.description;
+  const image = link.thumbnailUrl || preview?.image;
+
   return (
     <a
       href={link.url}
@@ -15,19 +33,19 @@ export function MessageLink({ link }: MessageLinkProps) {
       rel="noopener noreferrer"
       class="chat-message-link"
     >
-      {link.thumbnailUrl && (
+      {image && (
         <div class="chat-link-image">
-          <img src={link.thumbnailUrl} alt={link.title || ''} loading="lazy" />
+          <img src={image} alt={title || ''} loading="lazy" />
         </div>
       )}
       <div class="chat-link-content">
-        <div class="chat-link-title">{link.title || link.url}</div>
-        {link.description && (
-          <div class="chat-link-description">{link.description}</div>
+        <div class="chat-link-title">{title || link.url}</div>
+        {description && (
+          <div class="chat-link-description">{description}</div>
         )}
         <div class="chat-link-domain">
           <ExternalLink size={12} />
-          <span>{link.domain || extractDomain(link.url)}</span>
+          <span>{link.domain || preview?.domain || extractDomain(link.url)}</span>
         </div>
       </div>
     </a>
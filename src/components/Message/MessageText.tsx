@@ -1,31 +1,70 @@
 import { h } from 'preact';
-import { useEffect, useRef } from 'preact/hooks';
-import { renderMarkdown, highlightCode } from '../../utils/markdown';
-import { sanitizeHtml } from '../../utils/sanitize';
+import { useEffect, useMemo, useRef, useState } from 'preact/hooks';
+import { highlightCode } from '../../utils/markdown';
+import { renderMessageHtml, peekMessageHtml } from '../../utils/renderCache';
+import type { CodeTheme } from '../../utils/highlighter';
+import { metricStart, reportDuration } from '../../utils/metrics';
+import { isRenderWorkerAvailable, peekRendered, renderAsync, type RenderResult } from '../../utils/renderEngine';
 
 interface MessageTextProps {
+  messageId: string;
   content: string;
   enableMarkdown: boolean;
   enableCodeHighlight: boolean;
+  codeTheme: CodeTheme;
 }
 
-export function MessageText({ content, enableMarkdown, enableCodeHighlight }: MessageTextProps) {
+export function MessageText({ messageId, content, enableMarkdown, enableCodeHighlight, codeTheme }: MessageTextProps) {
   const contentRef = useRef<HTMLDivElement>(null);
+  const offThread = enableMarkdown && isRenderWorkerAvailable();
+  const options = { highlight: enableCodeHighlight, theme: codeTheme };
+  // Until the worker replies, show any cached render (by id or by content, so id changes and row
+  // remounts are hits). Cache lookups only: markdown is never rendered on the main thread here.
+  // On a miss the plain text is shown.
+  const [rendered, setRendered] = useState<(RenderResult & { provisional?: boolean }) | null>(() => {
+    if (!offThread) return null;
+    const cached = peekRendered(messageId, content, options);
+    if (cached) return cached;
+    const html = peekMessageHtml(messageId, content);
+    return html !== undefined ? { html, highlighted: false, provisional: true } : null;
+  });
 
+  // Worker path: keep showing the previous render until the new one arrives
   useEffect(() => {
-    if (enableCodeHighlight && contentRef.current) {
-      highlightCode(contentRef.current);
+    if (!offThread) return;
+    let active = true;
+    renderAsync(messageId, content, options).then(result => {
+      if (active && result) setRendered(result);
+    });
+    return () => { active = false; };
+  }, [offThread, messageId, content, enableCodeHighlight, codeTheme]);
+
+  const syncHtml = useMemo(
+    () => enableMarkdown && !offThread ? renderMessageHtml(messageId, content) : '',
+    [messageId, content, enableMarkdown, offThread]
+  );
+
+  const html = offThread ? rendered?.html : syncHtml;
+  // A provisional render is about to be replaced by the worker's, which highlights itself
+  const needsHighlight = enableCodeHighlight && html !== undefined && !(offThread && (rendered?.highlighted || rendered?.provisional));
+
+  useEffect(() => {
+    if (needsHighlight && contentRef.current) {
+      const start = metricStart();
+      highlightCode(contentRef.current, codeTheme).then(count => {
+        if (count > 0) reportDuration('highlight', start, { messageId, thread: 'main', blocks: count });
+      });
     }
-  }, [content, enableCodeHighlight]);
+  }, [html, needsHighlight, codeTheme]);
 
-  if (!enableMarkdown) {
-    return <div class="chat-message-text">{content}</div>;
+  if (!enableMarkdown || html === undefined) {
+    return <div ref={contentRef} class="chat-message-text">{content}</div>;
   }
 
-  const html = sanitizeHtml(renderMarkdown(content));
-
+  // Keyed by theme: highlighting rewrites the DOM, so a theme switch needs the unhighlighted markup back
   return (
     <div
+      key={needsHighlight ? codeTheme : undefined}
       ref={contentRef}
       class="chat-message-text"
       dangerouslySetInnerHTML={{ __html: html }}
@@ -6,13 +6,17 @@ import { MessageFile } from './MessageFile';
 import { MessageLink } from './MessageLink';
 import { formatTime } from '../../utils/formatters';
 import { cn } from '../../utils/cn';
+import type { CodeTheme } from '../../utils/highlighter';
 
 interface MessageProps {
   message: MessageType;
   features: Required<FeaturesConfig>;
+  codeTheme: CodeTheme;
+  retryLabel?: string;
+  onRetry?: (messageId: string) => void;
 }
 
-export function Message({ message, features }: MessageProps) {
+export function Message({ message, features, codeTheme, retryLabel, onRetry }: MessageProps) {
   const images = message.attachments?.filter(a => a.type === 'image') || [];
   const files = message.attachments?.filter(a => a.type === 'file') || [];
   const links = message.attachments?.filter(a => a.type === 'link') || [];
@@ -22,15 +26,18 @@ export function Message({ message, features }: MessageProps) {
       class={cn(
         'chat-message',
         `chat-message-${message.role}`,
-        message.status === 'error' && 'chat-message-error'
+        message.status === 'error' && 'chat-message-error',
+        message.status === 'streaming' && 'chat-message-streaming'
       )}
     >
       <div class="chat-message-content">
         {message.content && (
           <MessageText
+            messageId={message.id}
             content={message.content}
             enableMarkdown={features.markdown}
             enableCodeHighlight={features.codeHighlight}
+            codeTheme={codeTheme}
           />
         )}
 
@@ -47,6 +54,12 @@ export function Message({ message, features }: MessageProps) {
         ))}
 
         <div class="chat-message-time">{formatTime(message.createdAt)}</div>
+
+        {message.status === 'error' && message.role === 'user' && onRetry && (
+          <button class="chat-message-retry" onClick={() => onRetry(message.id)}>
+            {retryLabel}
+          </button>
+        )}
       </div>
     </div>
   );
@@ -23,7 +23,8 @@ export const DEFAULT_FEATURES: Required<FeaturesConfig> = {
   fileUpload: true,
   linkPreviews: true,
   typingIndicator: true,
-  soundNotifications: false
+  soundNotifications: false,
+  virtualScroll: true
 };
 
 export const DEFAULT_LABELS: Required<LabelsConfig> = {
@@ -31,6 +32,7 @@ export const DEFAULT_LABELS: Required<LabelsConfig> = {
   subtitle: 'Online',
   placeholder: 'Type a message...',
   sendButton: 'Send',
+  stopButton: 'Stop',
   uploadButton: 'Attach file',
   closeButton: 'Close',
   typingText: 'typing...',
@@ -44,7 +46,13 @@ export const DEFAULT_UPLOAD: Required<UploadConfig> = {
   maxFileSize: 10 * 1024 * 1024,
   maxFiles: 5,
   allowedTypes: ['image/*', 'application/pdf', '.doc', '.docx', '.txt'],
-  endpoint: '/upload'
+  endpoint: '/upload',
+  chunked: false,
+  chunkSize: 1024 * 1024,
+  concurrency: 3,
+  maxImageDimension: 0,
+  imageQuality: 0.85,
+  thumbnailSize: 320
 };
 
 export type MergedChatWidgetConfig = Required<Omit<ChatWidgetConfig, 'theme' | 'features' | 'labels' | 'upload'>> & {
@@ -67,11 +75,14 @@ export function mergeConfig(userConfig: ChatWidgetConfig): MergedChatWidgetConfi
     auth: userConfig.auth ?? {},
     startOpen: userConfig.startOpen ?? false,
     persistState: userConfig.persistState ?? false,
+    persistKey: userConfig.persistKey ?? '',
+    streaming: userConfig.streaming ?? false,
     onReady: userConfig.onReady ?? (() => {}),
     onOpen: userConfig.onOpen ?? (() => {}),
     onClose: userConfig.onClose ?? (() => {}),
     onMessageSent: userConfig.onMessageSent ?? (() => {}),
     onMessageReceived: userConfig.onMessageReceived ?? (() => {}),
-    onError: userConfig.onError ?? (() => {})
+    onError: userConfig.onError ?? (() => {}),
+    onMetric: userConfig.onMetric ?? (() => {})
   };
 }
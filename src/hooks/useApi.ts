@@ -1,8 +1,61 @@
 import ky, { type KyInstance } from 'ky';
-import type { AuthConfig, SendMessageRequest, SendMessageResponse, GetMessagesResponse, LinkPreviewResponse } from '../types';
+import type {
+  AuthConfig,
+  SendMessageRequest,
+  SendMessageResponse,
+  GetMessagesResponse,
+  LinkPreviewResponse,
+  StreamEvent,
+  UploadResponse,
+  UploadSessionRequest,
+  UploadSessionResponse
+} from '../types';
+import { readStream } from '../utils/stream';
+import { LRUCache } from '../utils/lru';
 
 let apiClient: KyInstance;
 
+const DEFAULT_TOKEN_TTL = 60 * 1000;
+const LINK_PREVIEW_TTL = 10 * 60 * 1000;
+
+type TokenProvider = () => string | Promise<string>;
+
+const inFlight = new Map<string, Promise<unknown>>();
+const tokenCache = new LRUCache<TokenProvider, string>(4);
+const linkPreviewCache = new LRUCache<string, LinkPreviewResponse>(200, LINK_PREVIEW_TTL);
+
+// Concurrent calls with the same key share one request
+function dedupe<T>(key: string, request: () => Promise<T>): Promise<T> {
+  const existing = inFlight.get(key);
+  if (existing) return existing as Promise<T>;
+  const promise = request().finally(() => inFlight.delete(key));
+  inFlight.set(key, promise);
+  return promise;
+}
+
+// Function tokens are awaited once per `tokenTtl` instead of before every request
+async function resolveToken(auth: AuthConfig): Promise<string> {
+  const provider = auth.token!;
+  if (typeof provider !== 'function') return provider;
+
+  const cached = tokenCache.get(provider);
+  if (cached !== undefined) return cached;
+
+  return dedupe('auth-token', async () => {
+    const token = await provider();
+    const ttl = auth.tokenTtl ?? DEFAULT_TOKEN_TTL;
+    if (ttl > 0) tokenCache.set(provider, token, ttl);
+    return token;
+  });
+}
+
+// Resolves string or (async) function tokens into request headers
+export async function getAuthHeaders(auth?: AuthConfig): Promise<Record<string, string>> {
+  if (!auth?.token) return {};
+  const token = await resolveToken(auth);
+  return { [auth.headerName || 'Authorization']: `Bearer ${token}` };
+}
+
 export function initApi(baseUrl: string, auth?: AuthConfig): void {
   apiClient = ky.create({
     prefixUrl: baseUrl,
@@ -11,9 +64,15 @@ export function initApi(baseUrl: string, auth?: AuthConfig): void {
     hooks: {
       beforeRequest: [
         async (request) => {
-          if (auth?.token) {
-            const token = typeof auth.token === 'function' ? await auth.token() : auth.token;
-            request.headers.set(auth.headerName || 'Authorization', `Bearer ${token}`);
+          const headers = await getAuthHeaders(auth);
+          Object.entries(headers).forEach(([name, value]) => request.headers.set(name, value));
+        }
+      ],
+      afterResponse: [
+        (_request, _options, response) => {
+          // A rejected token is dropped so the next request asks for a fresh one
+          if (response.status === 401 && typeof auth?.token === 'function') {
+            tokenCache.delete(auth.token);
           }
         }
       ]
@@ -25,13 +84,72 @@ export async function sendMessage(data: SendMessageRequest): Promise<SendMessage
   return apiClient.post('messages', { json: data }).json();
 }
 
-export async function getMessages(cursor?: string): Promise<GetMessagesResponse> {
-  const searchParams = cursor ? { cursor } : {};
-  return apiClient.get('messages', { searchParams }).json();
+export async function streamMessage(data: SendMessageRequest, onEvent: (event: StreamEvent) => void, signal?: AbortSignal): Promise<void> {
+  const response = await apiClient.post('messages/stream', {
+    json: data,
+    signal,
+    timeout: false,
+    retry: 0,
+    headers: { Accept: 'text/event-stream' }
+  });
+  await readStream(response, onEvent);
+}
+
+// `cursor` pages towards older messages; `since` limits the result to messages newer than that id
+export async function getMessages(cursor?: string, since?: string): Promise<GetMessagesResponse> {
+  const searchParams: Record<string, string> = {};
+  if (cursor) searchParams.cursor = cursor;
+  if (since) searchParams.since = since;
+  return dedupe(`messages?${new URLSearchParams(searchParams)}`, () =>
+    apiClient.get('messages', { searchParams }).json<GetMessagesResponse>()
+  );
+}
+
+// === CHUNKED UPLOADS ===
+// `endpoint` is the configured upload endpoint, e.g. '/upload'
+function chunkedPath(endpoint: string): string {
+  return `${endpoint.replace(/^\/+/, '')}/chunked`;
+}
+
+export async function createUploadSession(endpoint: string, data: UploadSessionRequest): Promise<UploadSessionResponse> {
+  return apiClient.post(chunkedPath(endpoint), { json: data }).json();
+}
+
+export async function uploadChunk(endpoint: string, uploadId: string, index: number, chunk: Blob, signal?: AbortSignal): Promise<void> {
+  await apiClient.put(`${chunkedPath(endpoint)}/${uploadId}/${index}`, {
+    body: chunk,
+    signal,
+    timeout: 60000,
+    headers: { 'Content-Type': 'application/octet-stream' },
+    retry: { limit: 5, methods: ['put'], backoffLimit: 8000 }
+  });
+}
+
+export async function uploadThumbnail(endpoint: string, uploadId: string, thumbnail: Blob, signal?: AbortSignal): Promise<void> {
+  await apiClient.put(`${chunkedPath(endpoint)}/${uploadId}/thumbnail`, {
+    body: thumbnail,
+    signal,
+    headers: { 'Content-Type': thumbnail.type || 'application/octet-stream' },
+    retry: { limit: 3, methods: ['put'] }
+  });
+}
+
+export async function completeUpload(endpoint: string, uploadId: string, signal?: AbortSignal): Promise<UploadResponse> {
+  return apiClient.post(`${chunkedPath(endpoint)}/${uploadId}/complete`, {
+    signal,
+    retry: { limit: 3, methods: ['post'] }
+  }).json();
 }
 
 export async function getLinkPreview(url: string): Promise<LinkPreviewResponse> {
-  return apiClient.get('link-preview', { searchParams: { url } }).json();
+  const cached = linkPreviewCache.get(url);
+  if (cached) return cached;
+
+  const preview = await dedupe(`link-preview?${url}`, () =>
+    apiClient.get('link-preview', { searchParams: { url } }).json<LinkPreviewResponse>()
+  );
+  linkPreviewCache.set(url, preview);
+  return preview;
 }
 
 export { apiClient };
@@ -1,7 +1,11 @@
-import { useState, useCallback, useEffect } from 'preact/hooks';
-import type { ChatState, Message } from '../types';
+import { useState, useCallback, useEffect, useRef } from 'preact/hooks';
+import type { ChatState, Message, SendMessageResponse } from '../types';
 import type { MergedChatWidgetConfig } from '../config';
-import { sendMessage, getMessages, initApi } from './useApi';
+import { sendMessage, streamMessage, getMessages, initApi } from './useApi';
+import { createFrameBatcher } from '../utils/stream';
+import { openMessageStore, type MessageStore } from '../utils/messageStore';
+import { createOutbox, isRetriableError, type Outbox } from '../utils/outbox';
+import { metricStart, reportDuration, reportAfterPaint } from '../utils/metrics';
 
 const initialState: ChatState = {
   isOpen: false,
@@ -10,20 +14,150 @@ const initialState: ChatState = {
   isTyping: false,
   error: null,
   hasMore: true,
-  nextCursor: undefined
+  nextCursor: undefined,
+  initialLoaded: false
 };
 
+// Appends messages that are not already present (by id)
+function mergeMessages(existing: Message[], incoming: Message[]): Message[] {
+  if (incoming.length === 0) return existing;
+  const ids = new Set(existing.map(m => m.id));
+  const fresh = incoming.filter(m => !ids.has(m.id));
+  return fresh.length > 0 ? existing.concat(fresh) : existing;
+}
+
+// Beyond this many pages behind, starting over from the newest page is cheaper than catching up
+const MAX_SYNC_PAGES = 5;
+
+// Fetches every message newer than `since`, oldest first.
+// Resolves null when the local copy is stale (unknown `since`) or too far behind.
+async function fetchNewer(since: string): Promise<Message[] | null> {
+  const pages: Message[][] = [];
+  let cursor: string | undefined;
+  for (let i = 0; i < MAX_SYNC_PAGES; i++) {
+    const response = await getMessages(cursor, since);
+    if (response.reset) return null;
+    pages.unshift(response.messages.slice().reverse());  // Copy: deduped responses are shared
+    if (!response.hasMore || !response.nextCursor) return pages.flat();
+    cursor = response.nextCursor;
+  }
+  return null;
+}
+
+// Messages only held in memory (sending, failed, streaming), kept when the history is replaced
+function unsettled(messages: Message[]): Message[] {
+  return messages.filter(m => m.status && m.status !== 'sent');
+}
+
 export function useChat(config: MergedChatWidgetConfig) {
   const [state, setState] = useState<ChatState>({
     ...initialState,
     isOpen: config.startOpen
   });
 
+  const storeRef = useRef<Promise<MessageStore | null> | null>(null);
+  const hydrated = useRef(false);
+  const outboxRef = useRef<Outbox | null>(null);
+  // Streams in flight, aborted by stop() and on unmount
+  const streams = useRef(new Set<AbortController>());
+  // Attachments of failed sends, kept so a manual retry can resend them
+  const failedAttachments = useRef(new Map<string, string[] | undefined>());
+
   useEffect(() => {
     initApi(config.apiUrl, config.auth);
+
+    // Messages queued in a previous session are shown as pending and delivered in order
+    const outbox = createOutbox({
+      apiUrl: config.apiUrl,
+      identity: config.persistKey,
+      send: sendMessage,
+      onDelivered: (entry, response) => applySent(entry.id, response),
+      onFailed: (entry, error) => markFailed(entry.id, entry.attachments, error)
+    });
+    outboxRef.current = outbox;
+
+    const queued = outbox.entries();
+    if (queued.length > 0) {
+      setState(prev => ({
+        ...prev,
+        messages: mergeMessages(prev.messages, queued.map(entry => ({
+          id: entry.id,
+          role: 'user' as const,
+          content: entry.content,
+          createdAt: entry.createdAt,
+          status: 'sending' as const
+        })))
+      }));
+      outbox.flush();
+    }
+
     config.onReady();
+    return () => {
+      outbox.dispose();
+      streams.current.forEach(controller => controller.abort());
+    };
   }, []);
 
+  // The local store is scoped to the API it mirrors and the signed-in user (persistKey),
+  // so users sharing a browser never see each other's history
+  const getStore = (): Promise<MessageStore | null> => {
+    if (!config.persistState) return Promise.resolve(null);
+    if (!storeRef.current) {
+      if (!config.persistKey) console.warn('ChatWidget: persistState needs persistKey, history is not persisted');
+      storeRef.current = config.persistKey
+        ? openMessageStore(`${config.apiUrl}|${config.persistKey}`, `${config.apiUrl}|`)
+        : Promise.resolve(null);
+    }
+    return storeRef.current;
+  };
+
+  const persist = (messages: Message[]) => {
+    if (config.persistState) getStore().then(store => store?.put(messages));
+  };
+
+  // Swaps the optimistic message for the server's copy and appends the bot response
+  const applySent = (tempId: string, response: SendMessageResponse) => {
+    persist(response.response ? [response.message, response.response] : [response.message]);
+    setState(prev => {
+      let newMessages = prev.messages
+        .filter(m => m.id !== tempId)
+        .concat([{ ...response.message, status: 'sent' as const }]);
+
+      // Add bot response if present
+      if (response.response) {
+        newMessages = newMessages.concat([response.response]);
+      }
+
+      return {
+        ...prev,
+        messages: newMessages,
+        isTyping: false
+      };
+    });
+    config.onMessageSent(response.message);
+  };
+
+  const markFailed = (tempId: string, attachmentIds: string[] | undefined, error: Error) => {
+    failedAttachments.current.set(tempId, attachmentIds);
+    setState(prev => ({
+      ...prev,
+      messages: prev.messages.map(m => m.id === tempId ? { ...m, status: 'error' as const } : m),
+      isTyping: false,
+      error: 'Failed to send message'
+    }));
+    config.onError(error);
+  };
+
+  // Hands a message to the outbox; it stays 'sending' until delivered
+  const queueSend = (tempId: string, content: string, attachmentIds: string[] | undefined, createdAt: string) => {
+    setState(prev => ({
+      ...prev,
+      messages: prev.messages.map(m => m.id === tempId ? { ...m, status: 'sending' as const } : m),
+      isTyping: false
+    }));
+    outboxRef.current?.enqueue({ id: tempId, content, attachments: attachmentIds, createdAt });
+  };
+
   const toggle = useCallback(() => {
     setState(prev => {
       const newIsOpen = !prev.isOpen;
@@ -45,23 +179,187 @@ export function useChat(config: MergedChatWidgetConfig) {
   const loadMessages = useCallback(async () => {
     if (state.isLoading || !state.hasMore) return;
     setState(prev => ({ ...prev, isLoading: true, error: null }));
+    let renderedFromStore = false;
 
     try {
+      const store = await getStore();
+
+      // First load with a local copy: render it right away, then fetch only newer messages
+      if (store && !hydrated.current) {
+        hydrated.current = true;
+        const [cached, meta] = await Promise.all([store.loadAll(), store.getMeta()]);
+        if (cached.length > 0) {
+          renderedFromStore = true;
+          setState(prev => ({
+            ...prev,
+            messages: mergeMessages(cached, prev.messages),
+            hasMore: meta?.hasMore ?? true,
+            nextCursor: meta?.nextCursor,
+            isLoading: false,
+            initialLoaded: true
+          }));
+
+          const newer = await fetchNewer(cached[cached.length - 1].id);
+          if (newer) {
+            store.put(newer);
+            setState(prev => ({ ...prev, messages: mergeMessages(prev.messages, newer) }));
+            return;
+          }
+
+          // Stale local copy: replace it with the newest page, as on a first visit
+          await store.clear();
+          const response = await getMessages();
+          const page = response.messages.slice().reverse();
+          store.put(page);
+          store.setMeta({ hasMore: response.hasMore, nextCursor: response.nextCursor });
+          setState(prev => ({
+            ...prev,
+            messages: page.concat(unsettled(prev.messages)),
+            hasMore: response.hasMore,
+            nextCursor: response.nextCursor
+          }));
+          return;
+        }
+      }
+
       const response = await getMessages(state.nextCursor);
+      const page = response.messages.slice().reverse();
+      store?.put(page);
+      store?.setMeta({ hasMore: response.hasMore, nextCursor: response.nextCursor });
       setState(prev => ({
         ...prev,
-        messages: [...response.messages.reverse(), ...prev.messages],
+        messages: page.concat(prev.messages),
         hasMore: response.hasMore,
         nextCursor: response.nextCursor,
-        isLoading: false
+        isLoading: false,
+        initialLoaded: true
       }));
     } catch (error) {
-      setState(prev => ({ ...prev, isLoading: false, error: 'Failed to load messages' }));
+      // Offline with a local copy on screen is not worth an error banner
+      setState(prev => ({ ...prev, isLoading: false, error: renderedFromStore ? prev.error : 'Failed to load messages' }));
       config.onError(error as Error);
     }
   }, [state.isLoading, state.hasMore, state.nextCursor, config]);
 
+  // Streams the bot's response into an in-progress assistant message.
+  // Deltas are buffered and committed to state at most once per animation frame.
+  const sendStreaming = async (tempId: string, createdAtSent: string, content: string, attachmentIds: string[] | undefined, sentAt: number) => {
+    const streamId = `stream-${Date.now()}`;
+    const createdAt = new Date().toISOString();
+    const metricDetail = { messageId: tempId, streaming: true };
+    const controller = new AbortController();
+    streams.current.add(controller);
+    let streamed = '';
+    let rendered = false;
+    let finalMessage: Message | undefined;
+    let userMessage: Message | undefined;
+
+    const batcher = createFrameBatcher(() => {
+      const text = streamed;
+      if (!rendered) {
+        rendered = true;
+        reportAfterPaint('send-render', sentAt, metricDetail);
+      }
+      setState(prev => {
+        const exists = prev.messages.some(m => m.id === streamId);
+        const messages = exists
+          ? prev.messages.map(m => m.id === streamId ? { ...m, content: text } : m)
+          : [...prev.messages, { id: streamId, role: 'assistant' as const, content: text, createdAt, status: 'streaming' as const }];
+        return { ...prev, messages, isTyping: false };
+      });
+    });
+
+    try {
+      await streamMessage({ content, attachments: attachmentIds, clientId: tempId }, (event) => {
+        switch (event.type) {
+          case 'user':
+            userMessage = event.message;
+            persist([event.message]);
+            setState(prev => ({
+              ...prev,
+              messages: prev.messages.map(m => m.id === tempId ? { ...event.message, status: 'sent' as const } : m)
+            }));
+            config.onMessageSent(event.message);
+            break;
+          case 'delta':
+            if (!streamed) reportDuration('send-first-byte', sentAt, metricDetail);
+            streamed += event.delta;
+            batcher.request();
+            break;
+          case 'done':
+            finalMessage = event.response;
+            break;
+          case 'error':
+            throw new Error(event.error);
+        }
+      }, controller.signal);
+
+      batcher.flushNow();
+      if (finalMessage) persist([finalMessage]);
+      setState(prev => {
+        let messages = userMessage
+          ? prev.messages
+          : prev.messages.map(m => m.id === tempId ? { ...m, status: 'sent' as const } : m);
+
+        if (finalMessage) {
+          const response = finalMessage;
+          messages = messages.some(m => m.id === streamId)
+            ? messages.map(m => m.id === streamId ? response : m)
+            : [...messages, response];
+        } else {
+          messages = messages.map(m => m.id === streamId ? { ...m, status: undefined } : m);
+        }
+
+        return { ...prev, messages, isTyping: false };
+      });
+      if (!rendered && finalMessage) reportAfterPaint('send-render', sentAt, metricDetail);
+    } catch (error) {
+      // Stopped by the user (or unmounted): keep what was streamed; an unconfirmed send can be retried
+      if (controller.signal.aborted) {
+        if (streamed) batcher.flushNow();
+        if (!userMessage) failedAttachments.current.set(tempId, attachmentIds);
+        setState(prev => ({
+          ...prev,
+          messages: prev.messages.map(m => {
+            if (m.id === streamId) return { ...m, status: undefined };
+            if (m.id === tempId && !userMessage) return { ...m, status: 'error' as const };
+            return m;
+          }),
+          isTyping: false
+        }));
+        return;
+      }
+
+      // Nothing reached the server yet: let the outbox deliver it (without streaming) later
+      if (!userMessage && !streamed && isRetriableError(error)) {
+        queueSend(tempId, content, attachmentIds, createdAtSent);
+        return;
+      }
+
+      if (streamed) batcher.flushNow();
+      failedAttachments.current.set(tempId, attachmentIds);
+      setState(prev => ({
+        ...prev,
+        messages: prev.messages.map(m => {
+          if (m.id === tempId || m.id === streamId) return { ...m, status: 'error' as const };
+          return m;
+        }),
+        isTyping: false,
+        error: 'Failed to send message'
+      }));
+      config.onError(error as Error);
+    } finally {
+      streams.current.delete(controller);
+    }
+  };
+
+  // Stops any response being streamed
+  const stop = useCallback(() => {
+    streams.current.forEach(controller => controller.abort());
+  }, []);
+
   const send = useCallback(async (content: string, attachmentIds?: string[]) => {
+    const sentAt = metricStart();
     const tempId = `temp-${Date.now()}`;
     const tempMessage: Message = {
       id: tempId,
@@ -77,45 +375,51 @@ export function useChat(config: MergedChatWidgetConfig) {
       isTyping: true
     }));
 
-    try {
-      const response = await sendMessage({ content, attachments: attachmentIds });
-      setState(prev => {
-        let newMessages = prev.messages
-          .filter(m => m.id !== tempId)
-          .concat([{ ...response.message, status: 'sent' as const }]);
+    // Keep order: while offline or with older messages still queued, go straight to the outbox
+    if (navigator.onLine === false || (outboxRef.current?.entries().length ?? 0) > 0) {
+      queueSend(tempId, content, attachmentIds, tempMessage.createdAt);
+      return;
+    }
 
-        // Add bot response if present
-        if (response.response) {
-          newMessages = newMessages.concat([response.response]);
-        }
+    if (config.streaming) {
+      await sendStreaming(tempId, tempMessage.createdAt, content, attachmentIds, sentAt);
+      return;
+    }
 
-        return {
-          ...prev,
-          messages: newMessages,
-          isTyping: false
-        };
-      });
-      config.onMessageSent(response.message);
+    try {
+      const response = await sendMessage({ content, attachments: attachmentIds, clientId: tempId });
+      reportDuration('send-first-byte', sentAt, { messageId: tempId, streaming: false });
+      applySent(tempId, response);
+      reportAfterPaint('send-render', sentAt, { messageId: tempId, streaming: false });
     } catch (error) {
-      setState(prev => ({
-        ...prev,
-        messages: prev.messages.map(m => m.id === tempId ? { ...m, status: 'error' } : m),
-        isTyping: false,
-        error: 'Failed to send message'
-      }));
-      config.onError(error as Error);
+      if (isRetriableError(error)) {
+        queueSend(tempId, content, attachmentIds, tempMessage.createdAt);
+      } else {
+        markFailed(tempId, attachmentIds, error as Error);
+      }
     }
   }, [config]);
 
+  // Re-queues a message that failed with a non-retriable error
+  const retry = useCallback((messageId: string) => {
+    const message = state.messages.find(m => m.id === messageId);
+    if (!message || message.status !== 'error' || message.role !== 'user') return;
+    const attachmentIds = failedAttachments.current.get(messageId);
+    failedAttachments.current.delete(messageId);
+    setState(prev => ({ ...prev, error: null }));
+    queueSend(messageId, message.content, attachmentIds, message.createdAt);
+  }, [state.messages]);
+
   const clearError = useCallback(() => setState(prev => ({ ...prev, error: null })), []);
   const setTyping = useCallback((isTyping: boolean) => setState(prev => ({ ...prev, isTyping })), []);
   const addMessage = useCallback((message: Message) => {
     setState(prev => ({ ...prev, messages: [...prev.messages, message] }));
+    persist([message]);
     config.onMessageReceived(message);
   }, [config]);
 
   return {
     state,
-    actions: { toggle, open, close, loadMessages, send, clearError, setTyping, addMessage }
+    actions: { toggle, open, close, loadMessages, send, stop, retry, clearError, setTyping, addMessage }
   };
 }
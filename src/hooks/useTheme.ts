@@ -1,6 +1,13 @@
 import { useEffect } from 'preact/hooks';
 import type { ThemeConfig } from '../types';
 
+export function resolveColorScheme(mode: ThemeConfig['mode']): 'light' | 'dark' {
+  if (mode === 'auto') {
+    return window.matchMedia('(prefers-color-scheme: dark)').matches ? 'dark' : 'light';
+  }
+  return mode === 'dark' ? 'dark' : 'light';
+}
+
 export function useTheme(theme: Required<ThemeConfig>, containerId: string) {
   useEffect(() => {
     const container = document.getElementById(containerId);
@@ -38,13 +45,6 @@ export function useTheme(theme: Required<ThemeConfig>, containerId: string) {
     Object.entries(cssVars).forEach(([key, value]) => container.style.setProperty(key, value));
 
     // Set data-theme attribute for CSS selectors
-    if (theme.mode === 'dark') {
-      container.setAttribute('data-theme', 'dark');
-    } else if (theme.mode === 'auto') {
-      const prefersDark = window.matchMedia('(prefers-color-scheme: dark)').matches;
-      container.setAttribute('data-theme', prefersDark ? 'dark' : 'light');
-    } else {
-      container.setAttribute('data-theme', 'light');
-    }
+    container.setAttribute('data-theme', resolveColorScheme(theme.mode));
   }, [theme, containerId]);
 }
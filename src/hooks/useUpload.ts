@@ -1,7 +1,10 @@
 import { useState, useCallback, useRef } from 'preact/hooks';
-import Uppy from '@uppy/core';
-import XHRUpload from '@uppy/xhr-upload';
+import type Uppy from '@uppy/core';
 import type { UploadConfig, UploadResponse, AuthConfig } from '../types';
+import { getAuthHeaders } from './useApi';
+import { uploadChunked } from '../utils/chunkedUpload';
+import { downscaleImage } from '../utils/image';
+import { metricStart, reportThroughput } from '../utils/metrics';
 
 interface UseUploadOptions {
   config: Required<UploadConfig>;
@@ -14,15 +17,57 @@ interface UseUploadOptions {
 interface UploadState {
   isUploading: boolean;
   progress: number;
+  fileProgress: number[];  // Percentage per entry of `files`
   files: File[];
 }
 
+const emptyState: UploadState = { isUploading: false, progress: 0, fileProgress: [], files: [] };
+
 export function useUpload({ config, apiUrl, auth, onUploadComplete, onError }: UseUploadOptions) {
-  const [state, setState] = useState<UploadState>({ isUploading: false, progress: 0, files: [] });
+  const [state, setState] = useState<UploadState>(emptyState);
   const uppyRef = useRef<Uppy | null>(null);
+  const uppyLoading = useRef<Promise<Uppy> | null>(null);
+  const abortRef = useRef<AbortController | null>(null);
+  // Start time and size of the batch in flight, for the throughput metric
+  const batchRef = useRef<{ start: number; bytes: number; files: number } | null>(null);
+  // Bytes uploaded / total per file, aggregated into the overall progress
+  const bytesRef = useRef<{ uploaded: number; total: number }[]>([]);
+
+  const reportProgress = useCallback((fileIndex: number, uploaded: number, total: number) => {
+    bytesRef.current[fileIndex] = { uploaded, total };
+    const bytes = bytesRef.current.filter(Boolean);
+    const sumUploaded = bytes.reduce((sum, b) => sum + b.uploaded, 0);
+    const sumTotal = bytes.reduce((sum, b) => sum + b.total, 0) || 1;
+    setState(prev => ({
+      ...prev,
+      progress: (sumUploaded / sumTotal) * 100,
+      fileProgress: prev.files.map((_, i) => {
+        const b = bytesRef.current[i];
+        return b ? (b.uploaded / (b.total || 1)) * 100 : 0;
+      })
+    }));
+  }, []);
+
+  const reportBatch = (chunked: boolean) => {
+    const batch = batchRef.current;
+    batchRef.current = null;
+    if (batch) reportThroughput('upload-throughput', batch.bytes, batch.start, { files: batch.files, chunked });
+  };
 
-  const initUppy = useCallback(() => {
-    if (uppyRef.current) return uppyRef.current;
+  // Uppy is fetched on the first attachment, keeping it out of the initial bundle
+  const initUppy = useCallback((): Promise<Uppy> => {
+    if (!uppyLoading.current) uppyLoading.current = createUppy().catch(error => {
+      uppyLoading.current = null;
+      throw error;
+    });
+    return uppyLoading.current;
+  }, [config, apiUrl, auth, onUploadComplete, onError, reportProgress]);
+
+  const createUppy = async (): Promise<Uppy> => {
+    const [{ default: Uppy }, { default: XHRUpload }] = await Promise.all([
+      import('@uppy/core'),
+      import('@uppy/xhr-upload')
+    ]);
 
     const uppy = new Uppy({
       restrictions: {
@@ -36,37 +81,55 @@ export function useUpload({ config, apiUrl, auth, onUploadComplete, onError }: U
     uppy.use(XHRUpload, {
       endpoint: `${apiUrl}${config.endpoint}`,
       fieldName: 'file',
-      headers: auth?.token ? { [auth.headerName || 'Authorization']: `Bearer ${typeof auth.token === 'function' ? '' : auth.token}` } : {}
+      // Resolved per request so function tokens work (and refresh)
+      async onBeforeRequest(xhr) {
+        const headers = await getAuthHeaders(auth);
+        Object.entries(headers).forEach(([name, value]) => xhr.setRequestHeader(name, value));
+      }
     });
 
     uppy.on('upload-progress', (file, progress) => {
-      const total = progress.bytesTotal || 1;
-      setState(prev => ({ ...prev, progress: (progress.bytesUploaded / total) * 100 }));
+      if (!file) return;
+      const index = uppy.getFiles().findIndex(f => f.id === file.id);
+      reportProgress(index, progress.bytesUploaded, progress.bytesTotal || 1);
     });
 
     uppy.on('complete', (result) => {
       const uploaded = result.successful?.map(file => (file.response?.body || {}) as unknown as UploadResponse).filter(f => f.id) || [];
-      setState({ isUploading: false, progress: 0, files: [] });
+      reportBatch(false);
+      setState(emptyState);
       onUploadComplete(uploaded);
       uppy.cancelAll();
     });
 
     uppy.on('error', (error) => {
-      setState({ isUploading: false, progress: 0, files: [] });
+      setState(emptyState);
       onError(error);
     });
 
     uppyRef.current = uppy;
     return uppy;
-  }, [config, apiUrl, auth, onUploadComplete, onError]);
+  };
 
-  const addFiles = useCallback((files: File[]) => {
-    const uppy = initUppy();
-    files.forEach(file => {
-      try { uppy.addFile({ name: file.name, type: file.type, data: file }); } catch (e) {}
+  const addFiles = useCallback(async (files: File[]) => {
+    let uppy: Uppy;
+    try {
+      uppy = await initUppy();
+    } catch (error) {
+      onError(error as Error);
+      return;
+    }
+    // Files rejected by the restrictions are left out, keeping indexes aligned with Uppy's
+    const accepted = files.filter(file => {
+      try {
+        uppy.addFile({ name: file.name, type: file.type, data: file });
+        return true;
+      } catch (e) {
+        return false;
+      }
     });
-    setState(prev => ({ ...prev, files: [...prev.files, ...files] }));
-  }, [initUppy]);
+    setState(prev => ({ ...prev, files: [...prev.files, ...accepted] }));
+  }, [initUppy, onError]);
 
   const removeFile = useCallback((index: number) => {
     const uppy = uppyRef.current;
@@ -80,13 +143,44 @@ export function useUpload({ config, apiUrl, auth, onUploadComplete, onError }: U
   const upload = useCallback(async () => {
     const uppy = uppyRef.current;
     if (!uppy || uppy.getFiles().length === 0) return;
-    setState(prev => ({ ...prev, isUploading: true }));
-    await uppy.upload();
-  }, []);
+    bytesRef.current = [];
+    setState(prev => ({ ...prev, isUploading: true, progress: 0, fileProgress: prev.files.map(() => 0) }));
+
+    // Large images are downscaled before any bytes go over the network
+    const files = await Promise.all(uppy.getFiles().map(async (file) => {
+      const original = file.data as File;
+      const resized = await downscaleImage(original, config.maxImageDimension, config.imageQuality);
+      if (resized !== original) uppy.setFileState(file.id, { data: resized, size: resized.size });
+      return resized;
+    }));
+
+    batchRef.current = { start: metricStart(), bytes: files.reduce((sum, file) => sum + file.size, 0), files: files.length };
+    if (!config.chunked) {
+      await uppy.upload();
+      return;
+    }
+
+    const controller = new AbortController();
+    abortRef.current = controller;
+    try {
+      const uploaded = await uploadChunked(files, { config, onProgress: reportProgress, signal: controller.signal });
+      reportBatch(true);
+      setState(emptyState);
+      onUploadComplete(uploaded);
+      uppy.cancelAll();
+    } catch (error) {
+      if (controller.signal.aborted) return;
+      setState(prev => ({ ...prev, isUploading: false }));
+      onError(error as Error);
+    } finally {
+      abortRef.current = null;
+    }
+  }, [config, reportProgress, onUploadComplete, onError]);
 
   const clear = useCallback(() => {
+    abortRef.current?.abort();
     uppyRef.current?.cancelAll();
-    setState({ isUploading: false, progress: 0, files: [] });
+    setState(emptyState);
   }, []);
 
   return { state, actions: { addFiles, removeFile, upload, clear } };
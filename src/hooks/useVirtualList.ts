@@ -0,0 +1,174 @@
+import { useState, useRef, useEffect, useLayoutEffect, useCallback } from 'preact/hooks';
+import type { RefObject } from 'preact';
+
+interface UseVirtualListOptions {
+  containerRef: RefObject<HTMLElement>;
+  count: number;
+  getKey: (index: number) => string;
+  enabled: boolean;
+  estimateHeight?: number;
+  overscan?: number;
+}
+
+export interface VirtualRange {
+  enabled: boolean;
+  start: number;
+  end: number;
+  paddingTop: number;
+  paddingBottom: number;
+}
+
+// Index of the last row whose top offset is <= y
+function findIndex(offsets: number[], y: number): number {
+  let low = 0;
+  let high = offsets.length - 2;
+  while (low < high) {
+    const mid = (low + high + 1) >> 1;
+    if (offsets[mid] <= y) low = mid;
+    else high = mid - 1;
+  }
+  return Math.max(0, low);
+}
+
+export function useVirtualList({
+  containerRef,
+  count,
+  getKey,
+  enabled,
+  estimateHeight = 96,
+  overscan = 800
+}: UseVirtualListOptions) {
+  const heights = useRef(new Map<string, number>());
+  const offsetsRef = useRef<number[]>([0]);
+  const anchor = useRef<{ key: string; offset: number } | null>(null);
+  const frame = useRef<number | null>(null);
+  const [viewport, setViewport] = useState({ scrollTop: 0, height: 0 });
+  const [, setVersion] = useState(0);
+
+  // Prefix sums of measured (or estimated) row heights; offsets[count] is the total height
+  const offsets = new Array<number>(count + 1);
+  offsets[0] = 0;
+  for (let i = 0; i < count; i++) {
+    offsets[i + 1] = offsets[i] + (heights.current.get(getKey(i)) ?? estimateHeight);
+  }
+  offsetsRef.current = offsets;
+
+  const readViewport = useCallback(() => {
+    const container = containerRef.current;
+    if (!container) return;
+    setViewport(prev =>
+      prev.scrollTop === container.scrollTop && prev.height === container.clientHeight
+        ? prev
+        : { scrollTop: container.scrollTop, height: container.clientHeight }
+    );
+  }, [containerRef]);
+
+  const onScroll = useCallback(() => {
+    if (!enabled || frame.current !== null) return;
+    frame.current = requestAnimationFrame(() => {
+      frame.current = null;
+      readViewport();
+    });
+  }, [enabled, readViewport]);
+
+  useLayoutEffect(() => {
+    if (enabled) readViewport();
+  }, [enabled, readViewport]);
+
+  useEffect(() => () => {
+    if (frame.current !== null) cancelAnimationFrame(frame.current);
+  }, []);
+
+  // Measure rendered rows; rows that grow or shrink above the viewport shift scrollTop
+  // by the same amount so the visible content stays put
+  useEffect(() => {
+    const container = containerRef.current;
+    if (!enabled || !container || typeof ResizeObserver === 'undefined') return;
+
+    const observer = new ResizeObserver((entries) => {
+      const current = offsetsRef.current;
+      const anchorIndex = findIndex(current, container.scrollTop);
+      let shift = 0;
+      let changed = false;
+
+      for (const entry of entries) {
+        const row = entry.target as HTMLElement;
+        const key = row.dataset.virtualKey;
+        const index = Number(row.dataset.virtualIndex);
+        if (!key) continue;
+
+        const height = entry.borderBoxSize?.[0]?.blockSize ?? row.getBoundingClientRect().height;
+        const previous = heights.current.get(key) ?? estimateHeight;
+        if (height === previous) continue;
+
+        heights.current.set(key, height);
+        changed = true;
+        if (index < anchorIndex) shift += height - previous;
+      }
+
+      if (shift !== 0) container.scrollTop += shift;
+      if (changed) setVersion(v => v + 1);
+    });
+
+    const observeRows = (records: MutationRecord[] = []) => {
+      // Unmounted rows are released so the observer does not keep them alive
+      records.forEach(record => record.removedNodes.forEach(node => {
+        if (node instanceof HTMLElement && node.dataset.virtualKey) observer.unobserve(node);
+      }));
+      container.querySelectorAll('[data-virtual-key]').forEach(row => observer.observe(row));
+    };
+    observeRows();
+    const mutations = new MutationObserver(observeRows);
+    mutations.observe(container, { childList: true, subtree: true });
+    const viewportObserver = new ResizeObserver(readViewport);
+    viewportObserver.observe(container);
+
+    return () => {
+      observer.disconnect();
+      mutations.disconnect();
+      viewportObserver.disconnect();
+    };
+  }, [enabled, containerRef, estimateHeight, readViewport]);
+
+  // Remember the first visible row so it can be pinned after rows are prepended
+  const captureAnchor = useCallback(() => {
+    const container = containerRef.current;
+    if (!container || count === 0) return;
+    const current = offsetsRef.current;
+    const index = findIndex(current, container.scrollTop);
+    anchor.current = { key: getKey(index), offset: container.scrollTop - current[index] };
+  }, [containerRef, count, getKey]);
+
+  useLayoutEffect(() => {
+    const container = containerRef.current;
+    const pinned = anchor.current;
+    if (!container || !pinned) return;
+
+    for (let i = 0; i < count; i++) {
+      if (getKey(i) === pinned.key) {
+        if (i === 0) return;  // Nothing was prepended yet
+        container.scrollTop = offsetsRef.current[i] + pinned.offset;
+        anchor.current = null;
+        readViewport();
+        return;
+      }
+    }
+    anchor.current = null;
+  }, [count]);
+
+  if (!enabled) {
+    return { range: { enabled: false, start: 0, end: count, paddingTop: 0, paddingBottom: 0 } as VirtualRange, onScroll, captureAnchor };
+  }
+
+  const start = findIndex(offsets, viewport.scrollTop - overscan);
+  const end = Math.min(count, findIndex(offsets, viewport.scrollTop + viewport.height + overscan) + 1);
+  const range: VirtualRange = {
+    enabled: true,
+    start,
+    end,
+    paddingTop: offsets[start],
+    paddingBottom: offsets[count] - offsets[end]
+  };
+
+  return { range, onScroll, captureAnchor };
+}
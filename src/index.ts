@@ -1,8 +1,9 @@
 import { h, render } from 'preact';
 import { ChatWidget } from './ChatWidget';
+import { startMetrics, stopMetrics } from './utils/metrics';
 import type { ChatWidgetConfig } from './types';
 
-export type { ChatWidgetConfig, Message, Attachment, ThemeConfig } from './types';
+export type { ChatWidgetConfig, Message, Attachment, ThemeConfig, PerformanceMetric, MetricName } from './types';
 export { ChatWidget as ChatWidgetComponent } from './ChatWidget';
 
 let widgetInstance: Element | null = null;
@@ -13,6 +14,7 @@ export const ChatWidgetAPI = {
       console.warn('ChatWidget already initialized');
       return;
     }
+    startMetrics(config.onMetric);
     const container = document.createElement('div');
     container.id = 'chat-widget-root';
     document.body.appendChild(container);
@@ -25,6 +27,7 @@ export const ChatWidgetAPI = {
       render(null, widgetInstance);
       widgetInstance.remove();
       widgetInstance = null;
+      stopMetrics();
     }
   }
 };
@@ -0,0 +1,49 @@
+import { h, render } from 'preact';
+import { ChatLauncher, loadChatWidget } from './components/ChatLauncher';
+import { startMetrics, stopMetrics } from './utils/metrics';
+import type { ChatWidgetConfig } from './types';
+import './styles/variables.css';
+import './styles/base.css';
+import './styles/toggle.css';
+import './styles/animations.css';
+
+export type { ChatWidgetConfig, Message, Attachment, ThemeConfig, PerformanceMetric, MetricName } from './types';
+
+// Lightweight entry: only the toggle button ships up front, the chat window is fetched on demand.
+// Same API as the full bundle, so hosts can switch by changing the script URL.
+let widgetInstance: Element | null = null;
+
+export const ChatWidgetAPI = {
+  init(config: ChatWidgetConfig): void {
+    if (widgetInstance) {
+      console.warn('ChatWidget already initialized');
+      return;
+    }
+    startMetrics(config.onMetric);
+    const container = document.createElement('div');
+    container.id = 'chat-widget-root';
+    document.body.appendChild(container);
+    render(h(ChatLauncher, { config }), container);
+    widgetInstance = container;
+  },
+
+  destroy(): void {
+    if (widgetInstance) {
+      render(null, widgetInstance);
+      widgetInstance.remove();
+      widgetInstance = null;
+      stopMetrics();
+    }
+  },
+
+  // Starts fetching the full widget ahead of the first click
+  preload(): Promise<void> {
+    return loadChatWidget().then(() => undefined);
+  }
+};
+
+if (typeof window !== 'undefined') {
+  (window as any).ChatWidget = ChatWidgetAPI;
+}
+
+export default ChatWidgetAPI;
@@ -21,7 +21,7 @@ export interface Message {
   content: string;
   attachments?: Attachment[];
   createdAt: string;
-  status?: 'sending' | 'sent' | 'error';
+  status?: 'sending' | 'sent' | 'error' | 'streaming';
 }
 
 // === CONFIG TYPES ===
@@ -49,6 +49,7 @@ export interface FeaturesConfig {
   linkPreviews?: boolean;
   typingIndicator?: boolean;
   soundNotifications?: boolean;
+  virtualScroll?: boolean;
 }
 
 export interface UploadConfig {
@@ -56,6 +57,12 @@ export interface UploadConfig {
   maxFiles?: number;
   allowedTypes?: string[];
   endpoint?: string;
+  chunked?: boolean;           // Resumable uploads in chunks instead of one multipart POST
+  chunkSize?: number;          // Bytes per chunk
+  concurrency?: number;        // Chunks in flight at once, across all files
+  maxImageDimension?: number;  // Downscale larger images before upload (0 = off)
+  imageQuality?: number;       // Encoder quality for downscaled JPEG/WebP images
+  thumbnailSize?: number;      // Longest edge of generated thumbnails (0 = off, chunked mode only)
 }
 
 export interface LabelsConfig {
@@ -63,6 +70,7 @@ export interface LabelsConfig {
   subtitle?: string;
   placeholder?: string;
   sendButton?: string;
+  stopButton?: string;
   uploadButton?: string;
   closeButton?: string;
   typingText?: string;
@@ -75,6 +83,7 @@ export interface LabelsConfig {
 export interface AuthConfig {
   token?: string | (() => string | Promise<string>);
   headerName?: string;
+  tokenTtl?: number;  // ms to reuse a token returned by a function (0 = call it for every request)
 }
 
 export interface ChatWidgetConfig {
@@ -89,18 +98,40 @@ export interface ChatWidgetConfig {
   auth?: AuthConfig;
   startOpen?: boolean;
   persistState?: boolean;
+  persistKey?: string;  // Stable id of the signed-in user; required by persistState, scopes the send outbox
+  streaming?: boolean;
   onReady?: () => void;
   onOpen?: () => void;
   onClose?: () => void;
   onMessageSent?: (message: Message) => void;
   onMessageReceived?: (message: Message) => void;
   onError?: (error: Error) => void;
+  onMetric?: (metric: PerformanceMetric) => void;
+}
+
+// === METRIC TYPES ===
+export type MetricName =
+  | 'tti'                // init() until the widget is first interactive
+  | 'send-first-byte'    // Send until the first response token (streaming) or the response (otherwise)
+  | 'send-render'        // Send until the response is first painted
+  | 'markdown'           // Markdown parse + sanitize of one message
+  | 'highlight'          // Code highlighting of one message
+  | 'upload-throughput'  // Bytes per second of one upload batch
+  | 'long-task';         // Main-thread task over 50ms
+
+export interface PerformanceMetric {
+  name: MetricName;
+  value: number;
+  unit: 'ms' | 'B/s';
+  startTime: number;  // performance.now() timestamp
+  detail?: Record<string, unknown>;
 }
 
 // === API TYPES ===
 export interface SendMessageRequest {
   content: string;
   attachments?: string[];
+  clientId?: string;  // Stable per message across retries, lets the server drop duplicates
 }
 
 export interface SendMessageResponse {
@@ -108,10 +139,17 @@ export interface SendMessageResponse {
   response?: Message;  // Bot's response
 }
 
+export type StreamEvent =
+  | { type: 'user'; message: Message }      // Persisted user message
+  | { type: 'delta'; delta: string }        // Next chunk of the bot's response
+  | { type: 'done'; response?: Message }    // Final bot message
+  | { type: 'error'; error: string };
+
 export interface GetMessagesResponse {
   messages: Message[];
   hasMore: boolean;
   nextCursor?: string;
+  reset?: boolean;  // The `since` id is unknown: this is the newest page and the local copy is stale
 }
 
 export interface UploadResponse {
@@ -123,6 +161,19 @@ export interface UploadResponse {
   thumbnailUrl?: string;
 }
 
+export interface UploadSessionRequest {
+  filename: string;
+  mimeType: string;
+  size: number;
+  chunkSize: number;
+  fingerprint: string;
+}
+
+export interface UploadSessionResponse {
+  uploadId: string;
+  received: number[];  // Chunk indexes the server already has (resumed upload)
+}
+
 export interface LinkPreviewResponse {
   url: string;
   title: string;
@@ -139,4 +190,5 @@ export interface ChatState {
   error: string | null;
   hasMore: boolean;
   nextCursor?: string;
+  initialLoaded: boolean;  // First page (or local copy) applied; messages may be non-empty before that
 }
@@ -0,0 +1,84 @@
+import type { UploadConfig, UploadResponse } from '../types';
+import { createUploadSession, uploadChunk, uploadThumbnail, completeUpload } from '../hooks/useApi';
+import { createThumbnail } from './image';
+
+interface ChunkedUploadOptions {
+  config: Required<UploadConfig>;
+  onProgress: (fileIndex: number, bytesUploaded: number, bytesTotal: number) => void;
+  signal?: AbortSignal;
+}
+
+// Runs at most `limit` tasks at a time, in submission order
+function createLimiter(limit: number) {
+  let active = 0;
+  const queue: (() => void)[] = [];
+
+  const next = () => {
+    if (active >= limit || queue.length === 0) return;
+    active++;
+    queue.shift()!();
+  };
+
+  return function run<T>(task: () => Promise<T>): Promise<T> {
+    return new Promise<T>((resolve, reject) => {
+      queue.push(() => {
+        task().then(resolve, reject).finally(() => {
+          active--;
+          next();
+        });
+      });
+      next();
+    });
+  };
+}
+
+export function fileFingerprint(file: File): string {
+  return `${file.name}:${file.size}:${file.lastModified}:${file.type}`;
+}
+
+// Uploads files as fixed-size chunks through one shared pool of `config.concurrency` requests.
+// Failed chunks are retried individually; a session for the same fingerprint resumes
+// with the chunks the server already has.
+export async function uploadChunked(files: File[], { config, onProgress, signal }: ChunkedUploadOptions): Promise<UploadResponse[]> {
+  const run = createLimiter(Math.max(1, config.concurrency));
+
+  return Promise.all(files.map(async (file, fileIndex) => {
+    const chunkSize = Math.max(64 * 1024, config.chunkSize);
+    const chunkCount = Math.max(1, Math.ceil(file.size / chunkSize));
+    const chunkBytes = (index: number) => Math.min(chunkSize, file.size - index * chunkSize);
+
+    const session = await run(() => createUploadSession(config.endpoint, {
+      filename: file.name,
+      mimeType: file.type || 'application/octet-stream',
+      size: file.size,
+      chunkSize,
+      fingerprint: fileFingerprint(file)
+    }));
+
+    const received = new Set(session.received);
+    let uploaded = 0;
+    received.forEach(index => { uploaded += chunkBytes(index); });
+    onProgress(fileIndex, uploaded, file.size);
+
+    const pending: Promise<void>[] = [];
+    for (let index = 0; index < chunkCount; index++) {
+      if (received.has(index)) continue;
+      pending.push(run(async () => {
+        const start = index * chunkSize;
+        await uploadChunk(config.endpoint, session.uploadId, index, file.slice(start, start + chunkSize), signal);
+        uploaded += chunkBytes(index);
+        onProgress(fileIndex, uploaded, file.size);
+      }));
+    }
+
+    const thumbnail = config.thumbnailSize ? createThumbnail(file, config.thumbnailSize) : Promise.resolve(null);
+    await Promise.all(pending);
+
+    const thumbnailBlob = await thumbnail;
+    if (thumbnailBlob) {
+      await run(() => uploadThumbnail(config.endpoint, session.uploadId, thumbnailBlob, signal)).catch(() => {});
+    }
+
+    return run(() => completeUpload(config.endpoint, session.uploadId, signal));
+  }));
+}
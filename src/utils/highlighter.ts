@@ -0,0 +1,113 @@
+import { hashString } from './hash';
+import { LRUCache } from './lru';
+
+export type CodeTheme = 'light' | 'dark';
+
+const THEMES: Record<CodeTheme, string> = {
+  light: 'github-light',
+  dark: 'github-dark'
+};
+
+// Shiki FontStyle bit flags
+const ITALIC = 1;
+const BOLD = 2;
+const UNDERLINE = 4;
+const STRIKETHROUGH = 8;
+
+interface TokenStyle {
+  color?: string;
+  fontStyle?: number;
+}
+
+interface Token {
+  content: string;
+  variants: Record<string, TokenStyle>;
+}
+
+// One highlighter for the whole page; grammars are added as code blocks need them
+let highlighterPromise: Promise<any> | null = null;
+const languages = new Map<string, Promise<string>>();
+// Tokens carry colors for both themes, so switching theme never re-tokenizes
+const tokenCache = new LRUCache<string, Token[][]>(300);
+const htmlCache = new LRUCache<string, string>(500);
+
+function getHighlighter(): Promise<any> {
+  if (!highlighterPromise) {
+    highlighterPromise = import('shiki').then(({ createHighlighter }) =>
+      createHighlighter({ themes: Object.values(THEMES), langs: [] })
+    );
+  }
+  return highlighterPromise;
+}
+
+// Resolves to the grammar name to highlight with, or 'text' when there is none
+function loadLanguage(lang: string): Promise<string> {
+  const name = (lang || 'text').trim().toLowerCase();
+  let loading = languages.get(name);
+
+  if (!loading) {
+    loading = Promise.all([import('shiki'), getHighlighter()])
+      .then(async ([{ bundledLanguages }, highlighter]) => {
+        if (!(name in bundledLanguages)) return 'text';
+        await highlighter.loadLanguage(name);
+        return name;
+      })
+      .catch(() => 'text');
+    languages.set(name, loading);
+  }
+  return loading;
+}
+
+function escapeHtml(text: string): string {
+  return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+}
+
+function tokenStyle(style: TokenStyle | undefined): string {
+  if (!style) return '';
+  const rules: string[] = [];
+  if (style.color) rules.push(`color:${style.color}`);
+  if (style.fontStyle) {
+    if (style.fontStyle & ITALIC) rules.push('font-style:italic');
+    if (style.fontStyle & BOLD) rules.push('font-weight:bold');
+    const decorations = [
+      style.fontStyle & UNDERLINE && 'underline',
+      style.fontStyle & STRIKETHROUGH && 'line-through'
+    ].filter(Boolean);
+    if (decorations.length) rules.push(`text-decoration:${decorations.join(' ')}`);
+  }
+  return rules.join(';');
+}
+
+// Same markup as Shiki's codeToHtml, built from cached tokens for one theme
+function renderTokens(lines: Token[][], theme: CodeTheme, lang: string, highlighter: any): string {
+  const { bg, fg } = highlighter.getTheme(THEMES[theme]);
+  const body = lines.map(line => {
+    const spans = line.map(token => {
+      const style = tokenStyle(token.variants[theme]);
+      const content = escapeHtml(token.content);
+      return style ? `<span style="${style}">${content}</span>` : `<span>${content}</span>`;
+    }).join('');
+    return `<span class="line">${spans}</span>`;
+  }).join('\n');
+
+  return `<pre class="shiki ${THEMES[theme]}" style="background-color:${bg};color:${fg}" tabindex="0" data-lang="${escapeHtml(lang)}"><code>${body}</code></pre>`;
+}
+
+export async function highlight(code: string, lang: string, theme: CodeTheme): Promise<string> {
+  const hash = hashString(code);
+  const htmlKey = `${hash}:${lang}:${theme}`;
+  const cached = htmlCache.get(htmlKey);
+  if (cached !== undefined) return cached;
+
+  const [resolved, highlighter] = await Promise.all([loadLanguage(lang), getHighlighter()]);
+  const tokenKey = `${hash}:${resolved}`;
+  let tokens = tokenCache.get(tokenKey);
+  if (!tokens) {
+    tokens = highlighter.codeToTokensWithThemes(code, { lang: resolved, themes: THEMES }) as Token[][];
+    tokenCache.set(tokenKey, tokens);
+  }
+
+  const html = renderTokens(tokens, theme, resolved, highlighter);
+  htmlCache.set(htmlKey, html);
+  return html;
+}
@@ -0,0 +1,51 @@
+// Image processing with createImageBitmap + OffscreenCanvas; every helper is a no-op where those are missing
+
+// Animated and vector formats would lose information when redrawn on a canvas
+const RESIZABLE = /^image\/(jpeg|png|webp|bmp)$/;
+
+function canProcess(file: Blob): boolean {
+  return RESIZABLE.test(file.type)
+    && typeof createImageBitmap === 'function'
+    && typeof OffscreenCanvas !== 'undefined';
+}
+
+async function drawScaled(file: Blob, maxDimension: number, type: string, quality: number): Promise<Blob | null> {
+  const bitmap = await createImageBitmap(file);
+  try {
+    const scale = Math.min(1, maxDimension / Math.max(bitmap.width, bitmap.height));
+    if (scale === 1 && file.type === type) return null;
+
+    const width = Math.max(1, Math.round(bitmap.width * scale));
+    const height = Math.max(1, Math.round(bitmap.height * scale));
+    const canvas = new OffscreenCanvas(width, height);
+    const ctx = canvas.getContext('2d');
+    if (!ctx) return null;
+    ctx.imageSmoothingQuality = 'high';
+    ctx.drawImage(bitmap, 0, 0, width, height);
+    return canvas.convertToBlob({ type, quality });
+  } finally {
+    bitmap.close();
+  }
+}
+
+// Returns a smaller copy of large images, or the original file
+export async function downscaleImage(file: File, maxDimension: number, quality: number): Promise<File> {
+  if (!maxDimension || !canProcess(file)) return file;
+  try {
+    const blob = await drawScaled(file, maxDimension, file.type, quality);
+    if (!blob || blob.size >= file.size) return file;
+    // Keep lastModified so the upload fingerprint stays stable across retries and reloads
+    return new File([blob], file.name, { type: blob.type, lastModified: file.lastModified });
+  } catch (e) {
+    return file;
+  }
+}
+
+export async function createThumbnail(file: Blob, size: number): Promise<Blob | null> {
+  if (!size || !canProcess(file)) return null;
+  try {
+    return await drawScaled(file, size, 'image/webp', 0.8);
+  } catch (e) {
+    return null;
+  }
+}
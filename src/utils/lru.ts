@@ -0,0 +1,44 @@
+interface Entry<V> {
+  value: V;
+  expires: number;  // 0 = never
+}
+
+// Minimal LRU cache on top of Map's insertion order, with optional per-entry TTL (ms)
+export class LRUCache<K, V> {
+  private map = new Map<K, Entry<V>>();
+
+  constructor(private maxSize: number, private ttl = 0) {}
+
+  get(key: K): V | undefined {
+    const entry = this.map.get(key);
+    if (!entry) return undefined;
+    this.map.delete(key);
+    if (entry.expires && entry.expires <= Date.now()) return undefined;
+    this.map.set(key, entry);
+    return entry.value;
+  }
+
+  set(key: K, value: V, ttl = this.ttl): void {
+    this.map.delete(key);
+    this.map.set(key, { value, expires: ttl ? Date.now() + ttl : 0 });
+    while (this.map.size > this.maxSize) {
+      this.map.delete(this.map.keys().next().value as K);
+    }
+  }
+
+  has(key: K): boolean {
+    return this.get(key) !== undefined;
+  }
+
+  delete(key: K): boolean {
+    return this.map.delete(key);
+  }
+
+  clear(): void {
+    this.map.clear();
+  }
+
+  get size(): number {
+    return this.map.size;
+  }
+}
@@ -1,6 +1,5 @@
 import MarkdownIt from 'markdown-it';
-
-let shikiHighlighter: any = null;
+import { highlight, type CodeTheme } from './highlighter';
 
 const md: MarkdownIt = new MarkdownIt({
   html: false,
@@ -8,8 +7,7 @@ const md: MarkdownIt = new MarkdownIt({
   typographer: true,
   breaks: true,
   highlight: (code: string, lang: string): string => {
-    const escaper = new MarkdownIt();
-    return `<pre class="chat-code-block" data-lang="${lang}"><code>${escaper.utils.escapeHtml(code)}</code></pre>`;
+    return `<pre class="chat-code-block" data-lang="${md.utils.escapeHtml(lang)}"><code>${md.utils.escapeHtml(code)}</code></pre>`;
   }
 });
 
@@ -30,15 +28,49 @@ export function renderMarkdown(content: string): string {
   return md.render(content);
 }
 
-export async function highlightCode(element: HTMLElement): Promise<void> {
-  if (!shikiHighlighter) {
-    const { createHighlighter } = await import('shiki');
-    shikiHighlighter = await createHighlighter({
-      themes: ['github-dark', 'github-light'],
-      langs: ['javascript', 'typescript', 'python', 'json', 'html', 'css', 'bash', 'sql']
-    });
+export interface MarkdownBlock {
+  source: string;  // Exact slice of the input, so blocks concatenate back to it
+  html: string;
+}
+
+// Reference-style link definitions resolve across blocks, so such content is rendered as a whole
+const REFERENCE_DEFINITION = /^ {0,3}\[[^\]]+\]:/m;
+
+// Renders content as a list of independent top-level blocks (paragraphs, lists, fences, tables...)
+export function renderMarkdownBlocks(content: string): MarkdownBlock[] {
+  if (REFERENCE_DEFINITION.test(content)) {
+    return [{ source: content, html: md.render(content) }];
+  }
+
+  const env = {};
+  const tokens = md.parse(content, env);
+  const groups: { start: number; tokens: typeof tokens }[] = [];
+
+  for (const token of tokens) {
+    if (token.level === 0 && token.nesting !== -1 && token.map) {
+      groups.push({ start: groups.length === 0 ? 0 : token.map[0], tokens: [token] });
+    } else if (groups.length > 0) {
+      groups[groups.length - 1].tokens.push(token);
+    }
   }
 
+  if (groups.length === 0) {
+    return [{ source: content, html: '' }];
+  }
+
+  const lines = content.split('\n');
+  return groups.map((group, i) => {
+    const end = i + 1 < groups.length ? groups[i + 1].start : lines.length;
+    const isLast = i + 1 === groups.length;
+    return {
+      source: lines.slice(group.start, end).join('\n') + (isLast ? '' : '\n'),
+      html: md.renderer.render(group.tokens, md.options, env)
+    };
+  });
+}
+
+// Resolves with the number of code blocks found
+export async function highlightCode(element: HTMLElement, theme: CodeTheme): Promise<number> {
   const codeBlocks = element.querySelectorAll('pre.chat-code-block');
 
   for (const block of codeBlocks) {
@@ -46,8 +78,53 @@ export async function highlightCode(element: HTMLElement): Promise<void> {
     const lang = block.getAttribute('data-lang') || 'text';
 
     try {
-      const html = shikiHighlighter.codeToHtml(code, { lang, theme: 'github-dark' });
-      block.outerHTML = html;
+      const html = await highlight(code, lang, theme);
+      // The message may have re-rendered while the grammar was loading
+      if (block.isConnected) block.outerHTML = html;
     } catch (e) {}
   }
+  return codeBlocks.length;
+}
+
+const CODE_BLOCK = /<pre class="chat-code-block" data-lang="([^"]*)"><code>([\s\S]*?)<\/code><\/pre>/g;
+
+function unescapeHtml(html: string): string {
+  return html.replace(/&lt;/g, '<').replace(/&gt;/g, '>').replace(/&quot;/g, '"').replace(/&amp;/g, '&');
+}
+
+// String counterpart of highlightCode, for contexts without a DOM (the render worker)
+export async function highlightHtml(html: string, theme: CodeTheme): Promise<string> {
+  const blocks = [...html.matchAll(CODE_BLOCK)];
+  if (blocks.length === 0) return html;
+
+  const highlighted = await Promise.all(blocks.map(([block, lang, code]) =>
+    highlight(unescapeHtml(code), lang || 'text', theme).catch(() => block)
+  ));
+
+  let index = 0;
+  return html.replace(CODE_BLOCK, () => highlighted[index++]);
+}
+
+// Re-renders only the tail of content that changed since `previous` was rendered.
+// Every block but the last is settled; the last one may still be growing.
+// Returns the block list and how many leading blocks were reused as-is.
+export function updateMarkdownBlocks(content: string, previous?: MarkdownBlock[]): { blocks: MarkdownBlock[]; reused: number } {
+  let reused = 0;
+  let offset = 0;
+
+  // A reference definition can change how earlier (settled) blocks render, e.g. one arriving at
+  // the end of a stream; check the whole message, not just the tail, and render it in one piece
+  if (REFERENCE_DEFINITION.test(content)) {
+    return { blocks: renderMarkdownBlocks(content), reused: 0 };
+  }
+
+  if (previous) {
+    while (reused < previous.length - 1 && content.startsWith(previous[reused].source, offset)) {
+      offset += previous[reused].source.length;
+      reused++;
+    }
+  }
+
+  const tail = renderMarkdownBlocks(content.slice(offset));
+  return { blocks: reused > 0 ? previous!.slice(0, reused).concat(tail) : tail, reused };
 }
@@ -0,0 +1,158 @@
+import type { Message } from '../types';
+
+const DB_NAME = 'chat-widget';
+const DB_VERSION = 2;
+const MESSAGES = 'messages';
+const META = 'meta';
+const BY_CREATED_AT = 'byConversationCreatedAt';
+const FLUSH_DELAY = 250;
+
+export interface StoreMeta {
+  hasMore: boolean;     // Whether older pages exist on the server
+  nextCursor?: string;  // Cursor for the page before the oldest stored message
+}
+
+interface MessageRecord {
+  conversation: string;
+  id: string;
+  createdAt: string;
+  message: Message;
+}
+
+export interface MessageStore {
+  loadAll(): Promise<Message[]>;
+  getMeta(): Promise<StoreMeta | undefined>;
+  put(messages: Message[]): void;
+  setMeta(meta: StoreMeta): void;
+  flush(): Promise<void>;
+  clear(): Promise<void>;
+}
+
+function promisify<T>(request: IDBRequest<T>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function transactionDone(tx: IDBTransaction): Promise<void> {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  });
+}
+
+function openDatabase(): Promise<IDBDatabase> {
+  const request = indexedDB.open(DB_NAME, DB_VERSION);
+  request.onupgradeneeded = () => {
+    const db = request.result;
+    // v1 keyed conversations by API URL only, shared between users; start over rather than migrate
+    Array.from(db.objectStoreNames).forEach(name => db.deleteObjectStore(name));
+    const messages = db.createObjectStore(MESSAGES, { keyPath: ['conversation', 'id'] });
+    messages.createIndex(BY_CREATED_AT, ['conversation', 'createdAt']);
+    db.createObjectStore(META, { keyPath: 'conversation' });
+  };
+  return promisify(request);
+}
+
+// Only settled messages are stored; temp, streaming and failed ones live in memory only
+function isPersistable(message: Message): boolean {
+  return !message.status || message.status === 'sent';
+}
+
+// Deletes every conversation starting with `scope` except `keep` (other users of the same API)
+function pruneConversations(db: IDBDatabase, keep: string, scope: string): Promise<void> {
+  const tx = db.transaction([MESSAGES, META], 'readwrite');
+  const messages = tx.objectStore(MESSAGES);
+  const meta = tx.objectStore(META);
+  const end = `${scope}\uffff`;
+  messages.delete(IDBKeyRange.bound([scope, ''], [keep, ''], false, true));
+  messages.delete(IDBKeyRange.bound([keep, '\uffff'], [end, ''], true, false));
+  meta.delete(IDBKeyRange.bound(scope, keep, false, true));
+  meta.delete(IDBKeyRange.bound(keep, end, true, false));
+  return transactionDone(tx);
+}
+
+// `scope`: other conversations sharing this prefix are dropped in the background
+export async function openMessageStore(conversation: string, scope?: string): Promise<MessageStore | null> {
+  if (typeof indexedDB === 'undefined') return null;
+
+  let db: IDBDatabase;
+  try {
+    db = await openDatabase();
+  } catch (e) {
+    return null;
+  }
+
+  if (scope && conversation.startsWith(scope)) pruneConversations(db, conversation, scope).catch(() => {});
+
+  // Writes are coalesced into one transaction per flush
+  const pendingMessages = new Map<string, Message>();
+  let pendingMeta: StoreMeta | null = null;
+  let timer: ReturnType<typeof setTimeout> | null = null;
+
+  const flush = async (): Promise<void> => {
+    if (timer !== null) {
+      clearTimeout(timer);
+      timer = null;
+    }
+    if (pendingMessages.size === 0 && !pendingMeta) return;
+
+    const tx = db.transaction([MESSAGES, META], 'readwrite');
+    const messageStore = tx.objectStore(MESSAGES);
+    pendingMessages.forEach(message => {
+      const { status, ...stored } = message;
+      messageStore.put({ conversation, id: message.id, createdAt: message.createdAt, message: stored } satisfies MessageRecord);
+    });
+    if (pendingMeta) tx.objectStore(META).put({ conversation, ...pendingMeta });
+    pendingMessages.clear();
+    pendingMeta = null;
+    await transactionDone(tx);
+  };
+
+  const scheduleFlush = () => {
+    if (timer === null) timer = setTimeout(() => { flush().catch(() => {}); }, FLUSH_DELAY);
+  };
+
+  if (typeof window !== 'undefined') {
+    window.addEventListener('pagehide', () => { flush().catch(() => {}); });
+  }
+
+  return {
+    async loadAll() {
+      const tx = db.transaction(MESSAGES, 'readonly');
+      const range = IDBKeyRange.bound([conversation, ''], [conversation, '\uffff']);
+      const records = await promisify(tx.objectStore(MESSAGES).index(BY_CREATED_AT).getAll(range)) as MessageRecord[];
+      return records.map(record => record.message);
+    },
+
+    async getMeta() {
+      const tx = db.transaction(META, 'readonly');
+      const record = await promisify(tx.objectStore(META).get(conversation));
+      if (!record) return undefined;
+      return { hasMore: record.hasMore, nextCursor: record.nextCursor ?? undefined };
+    },
+
+    put(messages) {
+      messages.filter(isPersistable).forEach(message => pendingMessages.set(message.id, message));
+      if (pendingMessages.size > 0) scheduleFlush();
+    },
+
+    setMeta(meta) {
+      pendingMeta = meta;
+      scheduleFlush();
+    },
+
+    flush,
+
+    async clear() {
+      pendingMessages.clear();
+      pendingMeta = null;
+      const tx = db.transaction([MESSAGES, META], 'readwrite');
+      tx.objectStore(MESSAGES).delete(IDBKeyRange.bound([conversation, ''], [conversation, '\uffff']));
+      tx.objectStore(META).delete(conversation);
+      await transactionDone(tx);
+    }
+  };
+}
@@ -0,0 +1,107 @@
+import type { MetricName, PerformanceMetric } from '../types';
+
+// User Timing entries are prefixed so they group together in DevTools' performance panel
+const PREFIX = 'chat-widget:';
+
+// Nothing is measured (or added to the performance timeline) until a handler is set
+let handler: ((metric: PerformanceMetric) => void) | null = null;
+let initStart = 0;
+let interactiveReported = false;
+let longTaskObserver: PerformanceObserver | null = null;
+
+function now(): number {
+  return typeof performance !== 'undefined' ? performance.now() : Date.now();
+}
+
+function emit(metric: PerformanceMetric): void {
+  try {
+    handler?.(metric);
+  } catch (e) {}  // A failing host callback must not break the widget
+}
+
+function observeLongTasks(): void {
+  if (typeof PerformanceObserver === 'undefined' || !PerformanceObserver.supportedEntryTypes?.includes('longtask')) return;
+  longTaskObserver = new PerformanceObserver(list => {
+    list.getEntries().forEach(entry => emit({
+      name: 'long-task',
+      value: entry.duration,
+      unit: 'ms',
+      startTime: entry.startTime,
+      detail: { attribution: entry.name }
+    }));
+  });
+  longTaskObserver.observe({ type: 'longtask' });
+}
+
+// Called from init(): starts the time-to-interactive clock
+export function startMetrics(onMetric?: (metric: PerformanceMetric) => void): void {
+  stopMetrics();
+  if (!onMetric) return;
+  handler = onMetric;
+  initStart = now();
+  interactiveReported = false;
+  try {
+    performance.mark(`${PREFIX}init`);
+  } catch (e) {}
+  observeLongTasks();
+}
+
+export function stopMetrics(): void {
+  handler = null;
+  longTaskObserver?.disconnect();
+  longTaskObserver = null;
+}
+
+export function isMeasuring(): boolean {
+  return handler !== null;
+}
+
+export function metricStart(): number {
+  return now();
+}
+
+// Reports the time from `start` until now, also recorded as a User Timing measure
+export function reportDuration(name: MetricName, start: number, detail?: Record<string, unknown>): void {
+  if (!handler) return;
+  const end = now();
+  try {
+    performance.measure(`${PREFIX}${name}`, { start, end, detail });
+  } catch (e) {}
+  emit({ name, value: end - start, unit: 'ms', startTime: start, detail });
+}
+
+// Like reportDuration, for durations measured elsewhere (the render worker)
+export function reportElapsed(name: MetricName, duration: number, detail?: Record<string, unknown>): void {
+  if (!handler) return;
+  reportDuration(name, now() - duration, detail);
+}
+
+export function reportThroughput(name: MetricName, bytes: number, start: number, detail?: Record<string, unknown>): void {
+  if (!handler) return;
+  const end = now();
+  const seconds = Math.max(end - start, 1) / 1000;
+  try {
+    performance.measure(`${PREFIX}${name}`, { start, end, detail: { ...detail, bytes } });
+  } catch (e) {}
+  emit({ name, value: bytes / seconds, unit: 'B/s', startTime: start, detail: { ...detail, bytes, duration: end - start } });
+}
+
+// Approximates the next paint: the frame callback runs before it, the task queued from it after
+export function afterPaint(callback: () => void): void {
+  if (typeof requestAnimationFrame !== 'function') {
+    setTimeout(callback, 0);
+    return;
+  }
+  requestAnimationFrame(() => setTimeout(callback, 0));
+}
+
+export function reportAfterPaint(name: MetricName, start: number, detail?: Record<string, unknown>): void {
+  if (handler) afterPaint(() => reportDuration(name, start, detail));
+}
+
+// First of the loader or the full widget to mount and paint
+export function reportInteractive(entry: 'loader' | 'widget'): void {
+  if (!handler || interactiveReported) return;
+  interactiveReported = true;
+  reportAfterPaint('tti', initStart, { entry });
+}
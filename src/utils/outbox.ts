@@ -0,0 +1,154 @@
+import { HTTPError, TimeoutError } from 'ky';
+import type { SendMessageRequest, SendMessageResponse } from '../types';
+
+const BASE_DELAY = 1000;
+const MAX_DELAY = 60 * 1000;
+// Failed attempts (not time offline) before an entry is given up on and shown as failed
+const MAX_ATTEMPTS = 8;
+const STORAGE_PREFIX = 'chat-widget-outbox:';
+
+export interface OutboxEntry {
+  id: string;  // Temp id of the optimistic message, also sent as clientId
+  content: string;
+  attachments?: string[];
+  createdAt: string;
+  attempts: number;
+}
+
+interface OutboxOptions {
+  apiUrl: string;
+  identity: string;  // Signed-in user; empty keeps the queue in memory only
+  send: (data: SendMessageRequest) => Promise<SendMessageResponse>;
+  onDelivered: (entry: OutboxEntry, response: SendMessageResponse) => void;
+  onFailed: (entry: OutboxEntry, error: Error) => void;
+}
+
+export interface Outbox {
+  entries(): OutboxEntry[];
+  enqueue(entry: Omit<OutboxEntry, 'attempts'>): void;
+  flush(): void;
+  dispose(): void;
+}
+
+// Offline, timeouts, rate limiting and server errors are worth another try; other 4xx are not
+export function isRetriableError(error: unknown): boolean {
+  if (typeof navigator !== 'undefined' && navigator.onLine === false) return true;
+  if (error instanceof TimeoutError) return true;
+  if (error instanceof HTTPError) {
+    const status = error.response.status;
+    return status === 408 || status === 425 || status === 429 || status >= 500;
+  }
+  // fetch rejects with a TypeError on network failure
+  return error instanceof TypeError;
+}
+
+function retryAfter(error: unknown): number | null {
+  if (!(error instanceof HTTPError)) return null;
+  const header = error.response.headers.get('Retry-After');
+  if (!header) return null;
+  const seconds = Number(header);
+  if (!Number.isNaN(seconds)) return seconds * 1000;
+  const date = Date.parse(header);
+  return Number.isNaN(date) ? null : Math.max(0, date - Date.now());
+}
+
+function backoff(attempts: number): number {
+  const delay = Math.min(MAX_DELAY, BASE_DELAY * 2 ** attempts);
+  return delay / 2 + Math.random() * delay / 2;
+}
+
+function dropOtherQueues(prefix: string, keep: string | null): void {
+  try {
+    const stale: string[] = [];
+    for (let i = 0; i < localStorage.length; i++) {
+      const key = localStorage.key(i);
+      if (key && key !== keep && (key === prefix || key.startsWith(`${prefix}|`))) stale.push(key);
+    }
+    stale.forEach(key => localStorage.removeItem(key));
+  } catch (e) {}
+}
+
+// Persistent FIFO of messages that could not be sent yet.
+// Entries are delivered strictly in order; a retriable failure pauses the queue with backoff,
+// and after MAX_ATTEMPTS failures the entry is reported as failed so later messages can go out.
+export function createOutbox({ apiUrl, identity, send, onDelivered, onFailed }: OutboxOptions): Outbox {
+  // One queue per API and user: queues of other users (or unscoped ones) are never replayed
+  // under this user's credentials, so they are dropped
+  const storageKey = identity ? `${STORAGE_PREFIX}${apiUrl}|${identity}` : null;
+  dropOtherQueues(`${STORAGE_PREFIX}${apiUrl}`, storageKey);
+  let queue: OutboxEntry[] = load();
+  let flushing = false;
+  let timer: ReturnType<typeof setTimeout> | null = null;
+
+  function load(): OutboxEntry[] {
+    if (!storageKey) return [];
+    try {
+      return JSON.parse(localStorage.getItem(storageKey) || '[]');
+    } catch (e) {
+      return [];
+    }
+  }
+
+  function save(): void {
+    if (!storageKey) return;
+    try {
+      if (queue.length > 0) localStorage.setItem(storageKey, JSON.stringify(queue));
+      else localStorage.removeItem(storageKey);
+    } catch (e) {}
+  }
+
+  function schedule(delay: number): void {
+    if (timer !== null) clearTimeout(timer);
+    timer = setTimeout(() => {
+      timer = null;
+      flush();
+    }, delay);
+  }
+
+  async function flush(): Promise<void> {
+    if (flushing || queue.length === 0) return;
+    if (typeof navigator !== 'undefined' && navigator.onLine === false) return;  // Resumed by the 'online' event
+    flushing = true;
+
+    try {
+      while (queue.length > 0) {
+        const entry = queue[0];
+        try {
+          const response = await send({ content: entry.content, attachments: entry.attachments, clientId: entry.id });
+          queue.shift();
+          save();
+          onDelivered(entry, response);
+        } catch (error) {
+          if (isRetriableError(error) && entry.attempts + 1 < MAX_ATTEMPTS) {
+            entry.attempts++;
+            save();
+            schedule(retryAfter(error) ?? backoff(entry.attempts));
+            return;
+          }
+          queue.shift();
+          save();
+          onFailed(entry, error as Error);
+        }
+      }
+    } finally {
+      flushing = false;
+    }
+  }
+
+  const handleOnline = () => flush();
+  if (typeof window !== 'undefined') window.addEventListener('online', handleOnline);
+
+  return {
+    entries: () => queue.slice(),
+    enqueue(entry) {
+      queue.push({ ...entry, attempts: 0 });
+      save();
+      if (timer === null) flush();  // Otherwise wait out the current backoff
+    },
+    flush: () => { flush(); },
+    dispose() {
+      if (timer !== null) clearTimeout(timer);
+      if (typeof window !== 'undefined') window.removeEventListener('online', handleOnline);
+    }
+  };
+}
@@ -0,0 +1,52 @@
+import { updateMarkdownBlocks, type MarkdownBlock } from './markdown';
+import { sanitizeHtml } from './sanitize';
+import { hashString } from './hash';
+import { LRUCache } from './lru';
+import { metricStart, reportDuration } from './metrics';
+
+interface RenderEntry {
+  content: string;
+  blocks: MarkdownBlock[];  // Sanitized per-block HTML
+  html: string;
+}
+
+// Per-message block lists, used to re-render only the changed tail of a growing message
+const entries = new LRUCache<string, RenderEntry>(200);
+// Final HTML by content hash, shared across ids (temp -> server id, stream -> final message)
+const htmlByHash = new LRUCache<string, string>(500);
+
+export function renderMessageHtml(messageId: string, content: string): string {
+  const cached = entries.get(messageId);
+  if (cached && cached.content === content) return cached.html;
+
+  // A stale entry is still safe to build on: renderBlocks re-checks every reused block
+  const hash = hashString(content);
+  const shared = htmlByHash.get(hash);
+  if (shared !== undefined) return shared;
+
+  const start = metricStart();
+  const blocks = renderBlocks(content, cached?.blocks);
+  const html = blocks.map(block => block.html).join('');
+  reportDuration('markdown', start, { messageId, thread: 'main', blocks: blocks.length });
+
+  entries.set(messageId, { content, blocks, html });
+  htmlByHash.set(hash, html);
+  return html;
+}
+
+// Cache-only lookup: never renders
+export function peekMessageHtml(messageId: string, content: string): string | undefined {
+  const cached = entries.get(messageId);
+  if (cached && cached.content === content) return cached.html;
+  return htmlByHash.get(hashString(content));
+}
+
+function renderBlocks(content: string, previous?: MarkdownBlock[]): MarkdownBlock[] {
+  const { blocks, reused } = updateMarkdownBlocks(content, previous);
+  return blocks.map((block, i) => i < reused ? block : { source: block.source, html: sanitizeHtml(block.html) });
+}
+
+export function clearRenderCache(): void {
+  entries.clear();
+  htmlByHash.clear();
+}
@@ -0,0 +1,173 @@
+import renderWorkerUrl from '../workers/render.worker?worker&url';
+import { renderMessageHtml } from './renderCache';
+import { sanitizeHighlightedHtml } from './sanitize';
+import { hashString } from './hash';
+import { LRUCache } from './lru';
+import { metricStart, reportElapsed } from './metrics';
+import type { CodeTheme } from './highlighter';
+
+// === WORKER PROTOCOL ===
+export interface RenderJob {
+  type: 'render';
+  id: number;
+  key: string;        // Message id, used for incremental re-rendering
+  content: string;
+  highlight: boolean;
+  theme: CodeTheme;
+}
+
+export type RenderWorkerRequest = RenderJob | { type: 'cancel'; id: number };
+
+export type RenderWorkerResponse =
+  | { type: 'result'; id: number; blocks: string[]; timings: RenderTimings }  // Unsanitized HTML per top-level block
+  | { type: 'error'; id: number; error: string };
+
+// Milliseconds spent in the worker; highlight is null when there was no code to highlight
+export interface RenderTimings {
+  markdown: number;
+  highlight: number | null;
+}
+
+export interface RenderResult {
+  html: string;
+  highlighted: boolean;
+}
+
+export interface RenderOptions {
+  highlight: boolean;
+  theme: CodeTheme;
+}
+
+interface PendingJob {
+  key: string;
+  content: string;
+  options: RenderOptions;
+  resolve: (result: RenderResult | null) => void;
+}
+
+// undefined = not started yet, null = unavailable (use the synchronous path)
+let worker: Worker | null | undefined;
+let nextId = 1;
+const pending = new Map<number, PendingJob>();
+const latestByKey = new Map<string, number>();
+const sanitizedBlocks = new LRUCache<string, string>(1000);
+const results = new LRUCache<string, RenderResult>(300);
+// Same results by content only, so an id change (temp -> server id, stream -> final message)
+// or a remount after `results` evicted the id still finds its HTML
+const resultsByContent = new LRUCache<string, RenderResult>(1000);
+
+function contentKey(content: string, options: RenderOptions): string {
+  return `${hashString(content)}:${options.highlight ? options.theme : 'plain'}`;
+}
+
+function resultKey(key: string, content: string, options: RenderOptions): string {
+  return `${key}:${contentKey(content, options)}`;
+}
+
+function spawnWorker(): Worker | null {
+  if (typeof Worker === 'undefined') return null;
+  try {
+    const url = new URL(renderWorkerUrl, import.meta.url);
+    if (url.origin === location.origin) {
+      return new Worker(url, { type: 'module' });
+    }
+    // The widget is usually served from a CDN; cross-origin workers must be bootstrapped from a blob
+    const shim = new Blob([`import ${JSON.stringify(url.href)};`], { type: 'text/javascript' });
+    return new Worker(URL.createObjectURL(shim), { type: 'module' });
+  } catch (e) {
+    return null;
+  }
+}
+
+function getWorker(): Worker | null {
+  if (worker !== undefined) return worker;
+
+  worker = spawnWorker();
+  if (worker) {
+    worker.onmessage = (event: MessageEvent<RenderWorkerResponse>) => handleResponse(event.data);
+    worker.onerror = () => disableWorker();
+  }
+  return worker;
+}
+
+// Falls back to the main thread for good, settling anything still in flight
+function disableWorker(): void {
+  worker?.terminate();
+  worker = null;
+  pending.forEach(job => job.resolve(renderFallback(job.key, job.content)));
+  pending.clear();
+  latestByKey.clear();
+}
+
+function renderFallback(key: string, content: string): RenderResult {
+  return { html: renderMessageHtml(key, content), highlighted: false };
+}
+
+function handleResponse(response: RenderWorkerResponse): void {
+  const job = pending.get(response.id);
+  if (!job) return;
+  pending.delete(response.id);
+  if (latestByKey.get(job.key) === response.id) latestByKey.delete(job.key);
+
+  if (response.type === 'error') {
+    job.resolve(renderFallback(job.key, job.content));
+    return;
+  }
+
+  // Reused blocks come back identical, so only new or changed ones are sanitized
+  const sanitizeStart = metricStart();
+  const html = response.blocks.map(block => {
+    const hash = hashString(block);
+    let sanitized = sanitizedBlocks.get(hash);
+    if (sanitized === undefined) {
+      sanitized = sanitizeHighlightedHtml(block);
+      sanitizedBlocks.set(hash, sanitized);
+    }
+    return sanitized;
+  }).join('');
+
+  const { timings } = response;
+  reportElapsed('markdown', timings.markdown + metricStart() - sanitizeStart, { messageId: job.key, thread: 'worker', blocks: response.blocks.length });
+  if (timings.highlight !== null) reportElapsed('highlight', timings.highlight, { messageId: job.key, thread: 'worker' });
+
+  const result = { html, highlighted: job.options.highlight };
+  results.set(resultKey(job.key, job.content, job.options), result);
+  resultsByContent.set(contentKey(job.content, job.options), result);
+  job.resolve(result);
+}
+
+function cancel(id: number): void {
+  const job = pending.get(id);
+  if (!job) return;
+  pending.delete(id);
+  job.resolve(null);
+  worker?.postMessage({ type: 'cancel', id } satisfies RenderWorkerRequest);
+}
+
+export function isRenderWorkerAvailable(): boolean {
+  return getWorker() !== null;
+}
+
+export function peekRendered(key: string, content: string, options: RenderOptions): RenderResult | null {
+  return results.get(resultKey(key, content, options)) ?? resultsByContent.get(contentKey(content, options)) ?? null;
+}
+
+// Renders markdown (and highlights code) off the main thread.
+// Resolves null when superseded by a newer render of the same key.
+export function renderAsync(key: string, content: string, options: RenderOptions): Promise<RenderResult | null> {
+  const cached = peekRendered(key, content, options);
+  if (cached) return Promise.resolve(cached);
+
+  const target = getWorker();
+  if (!target) return Promise.resolve(renderFallback(key, content));
+
+  const previous = latestByKey.get(key);
+  if (previous !== undefined) cancel(previous);
+
+  const id = nextId++;
+  latestByKey.set(key, id);
+  return new Promise(resolve => {
+    pending.set(id, { key, content, options, resolve });
+    target.postMessage({ type: 'render', id, key, content, ...options } satisfies RenderWorkerRequest);
+  });
+}
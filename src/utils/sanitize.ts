@@ -18,3 +18,21 @@ const ALLOWED_ATTR = [
 export function sanitizeHtml(html: string): string {
   return DOMPurify.sanitize(html, { ALLOWED_TAGS, ALLOWED_ATTR, ALLOW_DATA_ATTR: true });
 }
+
+// Shiki emits inline color styles; keep them only inside highlighted code blocks
+const SAFE_STYLE = /^(\s*(color|background-color|font-style|font-weight|text-decoration)\s*:\s*[#\w\s,.%-]+;?)+\s*$/i;
+
+DOMPurify.addHook('uponSanitizeAttribute', (node, data) => {
+  if (data.attrName !== 'style') return;
+  if (!(node as Element).closest?.('pre.shiki') || !SAFE_STYLE.test(data.attrValue)) {
+    data.keepAttr = false;
+  }
+});
+
+export function sanitizeHighlightedHtml(html: string): string {
+  return DOMPurify.sanitize(html, {
+    ALLOWED_TAGS,
+    ALLOWED_ATTR: [...ALLOWED_ATTR, 'style', 'tabindex'],
+    ALLOW_DATA_ATTR: true
+  });
+}
@@ -0,0 +1,127 @@
+import type { Message, StreamEvent } from '../types';
+
+// Reads a streamed POST /messages/stream body. `text/event-stream` bodies are
+// parsed as SSE frames carrying JSON payloads; any other chunked body is treated
+// as raw text deltas of the bot's response.
+export async function readStream(response: Response, onEvent: (event: StreamEvent) => void): Promise<void> {
+  if (!response.body) {
+    onEvent({ type: 'done' });
+    return;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  const isEventStream = (response.headers.get('content-type') || '').includes('text/event-stream');
+  let buffer = '';
+  let finished = false;
+
+  try {
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) {
+        finished = true;
+        break;
+      }
+      const chunk = decoder.decode(value, { stream: true });
+
+      if (!isEventStream) {
+        if (chunk) onEvent({ type: 'delta', delta: chunk });
+        continue;
+      }
+
+      buffer += chunk;
+      let boundary = buffer.search(/\r?\n\r?\n/);
+      while (boundary !== -1) {
+        const frame = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary).replace(/^\r?\n\r?\n/, '');
+        const event = parseFrame(frame);
+        if (event) onEvent(event);
+        boundary = buffer.search(/\r?\n\r?\n/);
+      }
+    }
+
+    const tail = decoder.decode();
+    if (!isEventStream) {
+      if (tail) onEvent({ type: 'delta', delta: tail });
+    } else if ((buffer + tail).trim()) {
+      const event = parseFrame(buffer + tail);
+      if (event) onEvent(event);
+    }
+  } finally {
+    // Stopped early (error event, handler threw, aborted): close the connection instead of
+    // leaving it open until the server ends it
+    if (!finished) reader.cancel().catch(() => {});
+  }
+}
+
+// Unnamed frames (SSE's default `message` type) are response deltas, as most LLM streams send them
+const DELTA_TYPES = ['', 'message', 'delta'];
+
+function parseFrame(frame: string): StreamEvent | null {
+  let type = '';
+  const data: string[] = [];
+
+  for (const line of frame.split(/\r?\n/)) {
+    if (line.startsWith(':')) continue;
+    if (line.startsWith('event:')) type = line.slice(6).trim();
+    else if (line.startsWith('data:')) data.push(line.slice(5).replace(/^ /, ''));
+  }
+  if (data.length === 0) return null;
+
+  const raw = data.join('\n');
+  if (raw === '[DONE]') return null;  // OpenAI-style end marker; the body ending is what completes the stream
+  try {
+    return toEvent(type, JSON.parse(raw));
+  } catch {
+    // Non-JSON data lines are plain text deltas
+    return DELTA_TYPES.includes(type) ? { type: 'delta', delta: raw } : null;
+  }
+}
+
+function isMessage(value: any): value is Message {
+  return !!value && typeof value === 'object' && typeof value.id === 'string' && typeof value.content === 'string';
+}
+
+// Frames whose payload does not fit their event are dropped
+function toEvent(type: string, payload: any): StreamEvent | null {
+  if (DELTA_TYPES.includes(type)) {
+    if (typeof payload === 'string') return { type: 'delta', delta: payload };
+    return typeof payload?.delta === 'string' ? { type: 'delta', delta: payload.delta } : null;
+  }
+  switch (type) {
+    case 'user':
+      return isMessage(payload?.message) ? { type: 'user', message: payload.message } : null;
+    case 'done':
+      return { type: 'done', response: isMessage(payload?.response) ? payload.response : undefined };
+    case 'error':
+      return { type: 'error', error: String(payload?.error ?? 'Stream failed') };
+    default:
+      return null;
+  }
+}
+
+// Coalesces many calls into one callback per animation frame
+export function createFrameBatcher(flush: () => void) {
+  let frame: number | null = null;
+  const schedule = typeof requestAnimationFrame === 'function'
+    ? requestAnimationFrame
+    : (cb: FrameRequestCallback) => setTimeout(() => cb(Date.now()), 16) as unknown as number;
+  const cancel = typeof cancelAnimationFrame === 'function' ? cancelAnimationFrame : clearTimeout;
+
+  return {
+    request() {
+      if (frame !== null) return;
+      frame = schedule(() => {
+        frame = null;
+        flush();
+      });
+    },
+    flushNow() {
+      if (frame !== null) {
+        cancel(frame);
+        frame = null;
+      }
+      flush();
+    }
+  };
+}
@@ -0,0 +1 @@
+/// <reference types="vite/client" />
@@ -0,0 +1,55 @@
+import { updateMarkdownBlocks, highlightHtml, type MarkdownBlock } from '../utils/markdown';
+import { LRUCache } from '../utils/lru';
+import type { RenderWorkerRequest, RenderWorkerResponse, RenderJob } from '../utils/renderEngine';
+
+// Markdown parsing and Shiki highlighting run here; sanitizing needs a DOM and stays on the main thread
+const ctx = self as unknown as {
+  postMessage(message: RenderWorkerResponse): void;
+  onmessage: ((event: MessageEvent<RenderWorkerRequest>) => void) | null;
+};
+
+const blocksByKey = new LRUCache<string, MarkdownBlock[]>(200);
+const queue: RenderJob[] = [];
+let current: number | null = null;
+let currentCancelled = false;
+
+ctx.onmessage = (event) => {
+  const request = event.data;
+  if (request.type === 'cancel') {
+    const index = queue.findIndex(job => job.id === request.id);
+    if (index !== -1) queue.splice(index, 1);
+    else if (current === request.id) currentCancelled = true;
+    return;
+  }
+  queue.push(request);
+  drain();
+};
+
+async function drain() {
+  if (current !== null) return;
+
+  while (queue.length > 0) {
+    const job = queue.shift()!;
+    current = job.id;
+    currentCancelled = false;
+
+    try {
+      const start = performance.now();
+      const { blocks } = updateMarkdownBlocks(job.content, blocksByKey.get(job.key));
+      blocksByKey.set(job.key, blocks);
+      const parsed = performance.now();
+
+      const hasCode = job.highlight && blocks.some(block => block.html.includes('chat-code-block'));
+      const html = hasCode
+        ? await Promise.all(blocks.map(block => highlightHtml(block.html, job.theme)))
+        : blocks.map(block => block.html);
+
+      const timings = { markdown: parsed - start, highlight: hasCode ? performance.now() - parsed : null };
+      if (!currentCancelled) ctx.postMessage({ type: 'result', id: job.id, blocks: html, timings });
+    } catch (error) {
+      if (!currentCancelled) ctx.postMessage({ type: 'error', id: job.id, error: String(error) });
+    }
+  }
+
+  current = null;
+}
@@ -4,32 +4,70 @@ import dts from 'vite-plugin-dts';
 import cssInjectedByJsPlugin from 'vite-plugin-css-injected-by-js';
 import { resolve } from 'path';
 
-export default defineConfig({
-  plugins: [
-    preact(),
-    dts({ insertTypesEntry: true }),
-    cssInjectedByJsPlugin()
-  ],
-  resolve: {
-    alias: {
-      '@': resolve(__dirname, 'src'),
-      'react': 'preact/compat',
-      'react-dom': 'preact/compat'
-    }
-  },
-  build: {
-    lib: {
-      entry: resolve(__dirname, 'src/index.ts'),
-      name: 'ChatWidget',
-      formats: ['es', 'umd'],
-      fileName: (format) => `chat-widget.${format}.js`
-    },
-    rollupOptions: {
-      output: {
-        assetFileNames: 'chat-widget.[ext]'
+// Libraries grouped into their own chunks so each is fetched only by the feature that needs it
+const CHUNK_GROUPS: Record<string, RegExp> = {
+  markdown: /node_modules\/(markdown-it[^/]*|linkify-it|mdurl|uc\.micro|punycode\.js|entities|dompurify)\//,
+  upload: /node_modules\/@uppy\//,
+  gallery: /node_modules\/glightbox\//
+};
+
+function manualChunks(id: string): string | undefined {
+  return Object.keys(CHUNK_GROUPS).find(name => CHUNK_GROUPS[name].test(id));
+}
+
+// `vite build` produces the code-split ES build (full widget + lazy loader);
+// `vite build --mode umd` adds the single-file UMD bundle, since UMD cannot split chunks.
+export default defineConfig(({ mode }) => {
+  const umd = mode === 'umd';
+
+  return {
+    plugins: [
+      preact(),
+      !umd && dts({ insertTypesEntry: true }),
+      cssInjectedByJsPlugin(umd ? {} : { relativeCSSInjection: true })
+    ],
+    resolve: {
+      alias: {
+        '@': resolve(__dirname, 'src'),
+        'react': 'preact/compat',
+        'react-dom': 'preact/compat'
       }
     },
-    minify: 'terser',
-    sourcemap: true
-  }
+    worker: {
+      // ES module workers so Shiki's grammars can still be code-split inside the render worker
+      format: 'es'
+    },
+    build: {
+      lib: umd
+        ? {
+            entry: resolve(__dirname, 'src/index.ts'),
+            name: 'ChatWidget',
+            formats: ['umd'],
+            fileName: () => 'chat-widget.umd.js'
+          }
+        : {
+            entry: {
+              'chat-widget': resolve(__dirname, 'src/index.ts'),
+              'chat-widget-loader': resolve(__dirname, 'src/loader.ts')
+            },
+            formats: ['es'],
+            fileName: (format, entryName) => `${entryName}.${format}.js`
+          },
+      // The UMD pass writes next to the ES build
+      emptyOutDir: !umd,
+      // Per-chunk CSS, injected when its chunk loads
+      cssCodeSplit: !umd,
+      rollupOptions: {
+        output: umd
+          ? { assetFileNames: 'chat-widget.[ext]' }
+          : {
+              assetFileNames: 'chat-widget.[ext]',
+              chunkFileNames: 'chunks/[name]-[hash].js',
+              manualChunks
+            }
+      },
+      minify: 'terser',
+      sourcemap: true
+    }
+  };
 });